@@ -3,7 +3,16 @@ A module containing the MimeType class, allowing for easy managing of mimetypes
 Main source: https://datatracker.ietf.org/doc/html/rfc6838#section-4
 """
 
-from .mimetypeplus import MimeType, MAGICMIME_AVAILABLE, PUREMAGICMIME_AVAILABLE
+from .mimetypeplus import (MimeType, MAGICMIME_AVAILABLE, PUREMAGICMIME_AVAILABLE,
+                           Verification, VERIFY_ACCEPT, VERIFY_REJECT, VERIFY_UNKNOWN,
+                           RaceResult, race_mime_string_from_path)
+from .index import MimeIndex
+from .consensus import DetectionResult, Candidate
+from .tracing import Tracer, set_tracer
+from . import bulk
 
 __version__ = "1.0.0.0"
-__all__ = ["MimeType", "MAGICMIME_AVAILABLE", "PUREMAGICMIME_AVAILABLE"]
+__all__ = ["MimeType", "MAGICMIME_AVAILABLE", "PUREMAGICMIME_AVAILABLE",
+           "Verification", "VERIFY_ACCEPT", "VERIFY_REJECT", "VERIFY_UNKNOWN",
+           "RaceResult", "race_mime_string_from_path", "MimeIndex",
+           "DetectionResult", "Candidate", "Tracer", "set_tracer", "bulk"]
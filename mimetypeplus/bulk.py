@@ -0,0 +1,171 @@
+"""
+bulk
+
+Vectorized normalization and validation of many mime type strings at once,
+such as whole columns of logged 'Content-Type' values.
+Every distinct value is only processed once, with the results broadcast back to every row.
+"""
+
+#pylint:disable=wildcard-import,unused-wildcard-import,pointless-string-statement
+
+from .typings import *
+from .mimetypeplus import MimeType
+
+"""True if the 'numpy' module was imported."""
+NUMPY_AVAILABLE: bool  # DO NOT MODIFY, READ ONLY
+try:
+    import numpy
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+"""
+Translation tables deleting every character allowed in a normalized mime type string,
+so that a valid string translates to an empty string.
+"""
+STRICT_VALIDATION_TABLE = str.maketrans("", "", MimeType.STRICTLY_ALLOWED_CHARACTERS + "/")
+VALIDATION_TABLE = str.maketrans("", "", MimeType.ALLOWED_CHARACTERS + "/")
+
+def normalize_one(value:Any) -> Union[str, None]:
+    """
+    normalize_one
+    Normalizes a single mime type string the same way a MimeType object would encode it.
+    Values with parameters fall back to actually creating a MimeType object.
+
+    Arguments:
+        value - The mime type string.
+
+    Returns:
+        The normalized string, or None if the value is not a string
+        or can not be converted into a mime type.
+    """
+    if not isinstance(value, str):
+        return None
+    if ";" in value:
+        try:
+            return str(MimeType(value))
+        except AssertionError:
+            return None
+    parts = value.split("/")
+    if len(parts) == 1:
+        return f"{parts[0].strip().lower()}/{MimeType.WILDCARD_SEQUENCE}"
+    if len(parts) == 2:
+        return f"{parts[0].strip().lower()}/{parts[1].strip().lower()}"
+    return None
+
+def validate_one(value:Any, strict:bool = True) -> bool:
+    """
+    validate_one
+    Validates a single mime type string the same way MimeType.is_valid would.
+
+    Arguments:
+        value - The mime type string.
+        strict - If true, strictly only the characters stated to be used
+            in mimetypes will be consitered valid.
+
+    Returns:
+        True if the value can be converted into a mime type and only uses allowed characters.
+    """
+    normalized = normalize_one(value)
+    if normalized is None:
+        return False
+    table = STRICT_VALIDATION_TABLE if strict else VALIDATION_TABLE
+    return normalized.partition(";")[0].translate(table) == ""
+
+def to_list(values:Iterable[Any]) -> List[Any]:
+    """
+    to_list
+    Converts the given values into a plain list of python objects.
+    NumPy arrays are converted in one go rather than item by item.
+
+    Arguments:
+        values - A list, any other iterable, or a NumPy array.
+
+    Returns:
+        A list of the values.
+    """
+    if NUMPY_AVAILABLE and isinstance(values, numpy.ndarray): #type:ignore
+        return cast(List[Any], values.ravel().tolist()) #type:ignore
+    if isinstance(values, list):
+        return values
+    return list(values)
+
+def broadcast(values:Iterable[Any],
+              function:Callable[[Any], Any],
+              dtype:Any = object
+             ) -> Union[List[Any], Any]:
+    """
+    broadcast
+    Applies the given function once for every distinct value,
+    and broadcasts the results back in the original order.
+
+    Arguments:
+        values - A list, any other iterable, or a NumPy array.
+        function - The function to apply to each distinct value.
+        dtype - The NumPy dtype of the output, used only if the input was a NumPy array.
+
+    Returns:
+        A list of the results, or a NumPy array of the same shape if the input was a NumPy array.
+    """
+    items = to_list(values)
+    results = {value: function(value) for value in dict.fromkeys(items)}
+    broadcasted = list(map(results.__getitem__, items))
+    if NUMPY_AVAILABLE and isinstance(values, numpy.ndarray): #type:ignore
+        array = numpy.empty(len(broadcasted), dtype=dtype) #type:ignore
+        array[:] = broadcasted
+        return array.reshape(values.shape) #type:ignore
+    return broadcasted
+
+def normalize(values:Iterable[Any]) -> Union[List[Union[str, None]], Any]:
+    """
+    normalize
+    Normalizes many mime type strings at once,
+    matching the output of str(MimeType(value)) for each value.
+
+    Arguments:
+        values - A list, any other iterable, or a NumPy object/string array of mime type strings.
+
+    Returns:
+        A list of normalized strings (or None where the value could not be converted),
+        or a NumPy object array of the same shape if the input was a NumPy array.
+    """
+    return broadcast(values, normalize_one)
+
+def validate(values:Iterable[Any], strict:bool = True) -> Union[List[bool], Any]:
+    """
+    validate
+    Validates many mime type strings at once,
+    matching the output of MimeType(value).is_valid(strict) for each value.
+
+    Arguments:
+        values - A list, any other iterable, or a NumPy object/string array of mime type strings.
+        strict - If true, strictly only the characters stated to be used
+            in mimetypes will be consitered valid.
+
+    Returns:
+        A list of booleans, or a NumPy bool array of the same shape if the input was a NumPy array.
+    """
+    return broadcast(values, lambda value: validate_one(value, strict), bool)
+
+def factorize(values:Iterable[Any]) -> Tuple[Union[List[int], Any], List[str]]:
+    """
+    factorize
+    Normalizes many mime type strings at once, returning them as categorical codes.
+
+    Arguments:
+        values - A list, any other iterable, or a NumPy object/string array of mime type strings.
+
+    Returns:
+        A tuple of the codes and the categories they index into.
+        The codes are a list of integers (or a NumPy integer array if the input was a NumPy array),
+        where -1 marks values that could not be converted.
+        The categories are the distinct normalized strings, in order of first appearance.
+    """
+    categories:Dict[str, int] = {}
+    def code_of(value:Any) -> int:
+        normalized = normalize_one(value)
+        if normalized is None:
+            return -1
+        return categories.setdefault(normalized, len(categories))
+    codes = broadcast(values, code_of, numpy.intp if NUMPY_AVAILABLE else int) #type:ignore
+    return codes, list(categories)
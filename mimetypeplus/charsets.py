@@ -0,0 +1,190 @@
+"""
+charsets
+
+Charset detection for text content, scanning only a bounded prefix
+(and optionally a sampled suffix) of the content, never decoding all of it.
+"""
+
+#pylint:disable=wildcard-import,unused-wildcard-import,pointless-string-statement
+
+import codecs
+import re
+
+from .typings import *
+
+"""The amount of bytes from the start of the content that are scanned."""
+CHARSET_READ_SIZE:int = 64 * 1024
+"""The amount of bytes from the end of the content that are scanned, if sampling the suffix."""
+CHARSET_SUFFIX_SIZE:int = 4 * 1024
+"""The amount of bytes from the start of the content searched for a declared charset."""
+CHARSET_DECLARATION_SIZE:int = 1024
+
+"""Byte order marks and the charset they indicate, longest first."""
+BYTE_ORDER_MARKS: Tuple[Tuple[bytes, str], ...] = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+"""Patterns of charset declarations in XML and HTML content."""
+CHARSET_DECLARATIONS: Tuple[Any, ...] = (
+    re.compile(rb"<\?xml[^>]*?\sencoding\s*=\s*[\"']([A-Za-z0-9._:-]+)[\"']"),
+    re.compile(rb"<meta[^>]*?\scharset\s*=\s*[\"']?([A-Za-z0-9._:-]+)", re.IGNORECASE),
+    re.compile(rb"<meta[^>]*?\scontent\s*=\s*[\"'][^\"']*?charset\s*=\s*([A-Za-z0-9._:-]+)",
+               re.IGNORECASE),
+)
+
+"""
+Bytes not expected in text content (most control characters),
+any of these being present marks the content as binary.
+"""
+BINARY_BYTES:bytes = bytes(sorted(
+    set(range(0x20)) - {0x07, 0x08, 0x09, 0x0a, 0x0b, 0x0c, 0x0d, 0x1b}
+))
+
+def charset_from_bom(head:bytes) -> Union[str, None]:
+    """
+    charset_from_bom
+    Gets the charset of content from its byte order mark.
+
+    Arguments:
+        head - The first bytes of the content.
+
+    Returns:
+        The charset name if the content starts with a byte order mark, otherwise None.
+    """
+    for bom, charset in BYTE_ORDER_MARKS:
+        if head.startswith(bom):
+            return charset
+    return None
+
+def charset_from_declaration(head:bytes) -> Union[str, None]:
+    """
+    charset_from_declaration
+    Gets the charset declared by XML or HTML content (in a xml declaration or meta tag).
+
+    Arguments:
+        head - The first bytes of the content.
+
+    Returns:
+        The lowercase charset name if one is declared and known to python, otherwise None.
+    """
+    head = head[:CHARSET_DECLARATION_SIZE]
+    for pattern in CHARSET_DECLARATIONS:
+        match = pattern.search(head)
+        if match is not None:
+            charset = match.group(1).decode("ascii").lower()
+            try:
+                codecs.lookup(charset)
+            except LookupError:
+                continue
+            return charset
+    return None
+
+def is_binary(sample:bytes) -> bool:
+    """
+    is_binary
+    Checks if the given sample of content contains bytes not expected in text.
+
+    Arguments:
+        sample - A part of the content.
+
+    Returns:
+        True if the sample contains control characters that do not appear in text.
+    """
+    return len(sample) != len(sample.translate(None, BINARY_BYTES))
+
+def is_utf8(sample:bytes, final:bool) -> bool:
+    """
+    is_utf8
+    Checks if the given sample of content is valid UTF-8,
+    allowing for a character to be cut off at the end of the sample if it is not final.
+
+    Arguments:
+        sample - A part of the content.
+        final - True if the sample reaches the end of the content.
+
+    Returns:
+        True if the sample is valid UTF-8.
+    """
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+def charset_from_data(buffer:Union[bytes, bytearray, memoryview],
+                      *,
+                      sample_suffix:bool = False,
+                      partial:bool = False
+                     ) -> Union[str, None]:
+    """
+    charset_from_data
+    Gets the charset of the given text content, scanning at most
+    CHARSET_READ_SIZE bytes from its start (and CHARSET_SUFFIX_SIZE from its end if sampled).
+    In order, byte order marks, declared charsets in XML and HTML content,
+    UTF-8 validity and finally a ASCII/Latin-1 fallback are used.
+
+    Arguments:
+        buffer - The content.
+        sample_suffix - Also scan the end of the content,
+            catching content that only stops being ASCII or UTF-8 later on.
+        partial - True if the buffer is only the start of the content,
+            in which case it may end in a cut off character.
+
+    Returns:
+        The lowercase charset name, or None if the content looks like binary data.
+    """
+    head = bytes(buffer[:CHARSET_READ_SIZE])
+    charset = charset_from_bom(head)
+    if charset is not None:
+        return charset
+
+    samples = [(head, not partial and len(buffer) <= CHARSET_READ_SIZE)]
+    if sample_suffix and not partial and len(buffer) > CHARSET_READ_SIZE:
+        tail = bytes(buffer[max(CHARSET_READ_SIZE, len(buffer) - CHARSET_SUFFIX_SIZE):])
+        #skip the continuation bytes of any character cut off at the start of the sample
+        skip = 0
+        while skip < min(3, len(tail)) and 0x80 <= tail[skip] <= 0xbf:
+            skip += 1
+        samples.append((tail[skip:], True))
+
+    for sample, _ in samples:
+        if is_binary(sample):
+            return None
+
+    charset = charset_from_declaration(head)
+    if charset is not None:
+        return charset
+
+    if all(sample.isascii() for sample, _ in samples):
+        return "us-ascii"
+    if all(is_utf8(sample, final) for sample, final in samples):
+        return "utf-8"
+    return "iso-8859-1"
+
+def decode_head(buffer:Union[bytes, bytearray, memoryview],
+                charset:str,
+                size:int = CHARSET_READ_SIZE,
+                partial:bool = False
+               ) -> str:
+    """
+    decode_head
+    Decodes only the start of the given content,
+    dropping any character cut off at the end of the decoded part.
+
+    Arguments:
+        buffer - The content.
+        charset - The charset of the content.
+        size - The maximum amount of bytes to decode.
+        partial - True if the buffer is only the start of the content.
+
+    Returns:
+        The decoded start of the content, without any byte order mark.
+    """
+    if charset in ("utf-8", "us-ascii"):
+        charset = "utf-8-sig"
+    decoder = codecs.getincrementaldecoder(charset)("replace")
+    return decoder.decode(bytes(buffer[:size]), not partial and len(buffer) <= size)
@@ -7,9 +7,10 @@ Local command line based utilities for mime type checking.
 #pylint:disable=pointless-string-statement
 
 from shutil import which
-from subprocess import check_output
+from subprocess import PIPE, CalledProcessError, Popen, TimeoutExpired
 
 from .typings import * #pylint:disable=wildcard-import,unused-wildcard-import
+from .tracing import span
 
 """
 Holds either the system's path to the 'file' command's executable,
@@ -27,13 +28,65 @@ or None, if it wasn't found.
 """
 XDGMIME_CMD:Union[LiteralString, None] = cast(LiteralString, which("xdg-mime"))
 
-def file_cmd_mime_type_from_path(path:Union[Path, PathLike, str]) -> Union[str, None]:
+def run_command(args:List[str], timeout:Union[float, None] = None) -> str:
+    """
+    run_command
+    Runs a command and gets its output, the same as subprocess.check_output,
+    tracing the spawn of the process and the wait for it separately.
+
+    Arguments:
+        args - The command and its arguments.
+        timeout - The amount of seconds the command may run for, or None to wait for it.
+            Once overdue, the command is killed and subprocess.TimeoutExpired is raised.
+
+    Returns:
+        The text output of the command.
+    """
+    with span("spawn", "subprocess", command=args[0]):
+        process = Popen(args, stdout=PIPE, text=True)
+    with process, span("wait", "subprocess", command=args[0]) as wait:
+        try:
+            output, _ = process.communicate(timeout=timeout)
+        except TimeoutExpired:
+            process.kill()
+            process.communicate()
+            raise
+        wait.set(returncode=process.returncode)
+    if process.returncode != 0:
+        raise CalledProcessError(process.returncode, args, output=output)
+    return output
+
+def local_file_path(path:Union[Path, PathLike, str]) -> Union[Path, None]:
+    """
+    local_file_path
+    Resolves the given path, checking that it is an existing file, traced as a stat.
+
+    Arguments:
+        path - The local path to the file on the system.
+
+    Returns:
+        The resolved path, or None if it is not an existing file.
+    """
+    with span("stat", "io", path=path):
+        try:
+            resolved = Path(path).expanduser().resolve()
+        except TypeError:
+            return None
+        if not resolved.exists() or not resolved.is_file():
+            return None
+    return resolved
+
+def file_cmd_mime_type_from_path(path:Union[Path, PathLike, str],
+                                 timeout:Union[float, None] = None
+                                ) -> Union[str, None]:
     """
     file_cmd_mime_type_from_path
     Runs the system's 'file' command (if found) on the given path.
 
     Arguments:
         path - The local path to the file on the system.
+        timeout - The amount of seconds the command may run for, or None to wait for it.
+            Once overdue, the command is killed and subprocess.TimeoutExpired is raised.
 
     Returns:
         None if the type is not found, or 'file' is not acessable in the current environment,
@@ -42,26 +95,25 @@ def file_cmd_mime_type_from_path(path:Union[Path, PathLike, str]) -> Union[str,
     if FILE_CMD is None:
         return None
 
-    try:
-        path = Path(path)
-        path = path.expanduser().resolve()
-    except TypeError:
-        return None
-
-    if not path.exists() or not path.is_file():
+    local_path = local_file_path(path)
+    if local_path is None:
         return None
 
-    args = [FILE_CMD, "--mime-type", "-b", str(path)]
-    guess = check_output(args, shell=True, text=True).strip()
+    args = [FILE_CMD, "--mime-type", "-b", str(local_path)]
+    guess = run_command(args, timeout).strip()
     return guess if guess != "" else None
 
-def mimetype_cmd_mime_type_from_path(path:Union[Path, PathLike, str]) -> Union[str, None]:
+def mimetype_cmd_mime_type_from_path(path:Union[Path, PathLike, str],
+                                     timeout:Union[float, None] = None
+                                    ) -> Union[str, None]:
     """
     mimetype_cmd_mime_type_from_path
     Runs the system's 'mimetype' command (if found) on the given path.
 
     Arguments:
         path - The local path to the file on the system.
+        timeout - The amount of seconds the command may run for, or None to wait for it.
+            Once overdue, the command is killed and subprocess.TimeoutExpired is raised.
 
     Returns:
         None if the type is not found, or 'mimetype' is not acessable in the current environment,
@@ -70,26 +122,25 @@ def mimetype_cmd_mime_type_from_path(path:Union[Path, PathLike, str]) -> Union[s
     if MIMETYPE_CMD is None:
         return None
 
-    try:
-        path = Path(path)
-        path = path.expanduser().resolve()
-    except TypeError:
+    local_path = local_file_path(path)
+    if local_path is None:
         return None
 
-    if not path.exists() or not path.is_file():
-        return None
-
-    args = [MIMETYPE_CMD, "-i", "-b", str(path)]
-    guess = check_output(args, shell=True, text=True).strip()
+    args = [MIMETYPE_CMD, "-i", "-b", str(local_path)]
+    guess = run_command(args, timeout).strip()
     return guess if guess != "" else None
 
-def xdgmime_cmd_mime_type_from_path(path:Union[Path, PathLike, str]) -> Union[str, None]:
+def xdgmime_cmd_mime_type_from_path(path:Union[Path, PathLike, str],
+                                    timeout:Union[float, None] = None
+                                   ) -> Union[str, None]:
     """
     xdgmime_cmd_mime_type_from_path
     Runs the system's 'xdg-mime' command (if found) on the given path.
 
     Arguments:
         path - The local path to the file on the system.
+        timeout - The amount of seconds the command may run for, or None to wait for it.
+            Once overdue, the command is killed and subprocess.TimeoutExpired is raised.
 
     Returns:
         None if the type is not found, or 'xdg-mime' is not acessable in the current environment,
@@ -98,15 +149,10 @@ def xdgmime_cmd_mime_type_from_path(path:Union[Path, PathLike, str]) -> Union[st
     if XDGMIME_CMD is None:
         return None
 
-    try:
-        path = Path(path)
-        path = path.expanduser().resolve()
-    except TypeError:
-        return None
-
-    if not path.exists() or not path.is_file():
+    local_path = local_file_path(path)
+    if local_path is None:
         return None
 
-    args = [XDGMIME_CMD, "query", "filetype", str(path)]
-    guess = check_output(args, shell=True, text=True).strip()
+    args = [XDGMIME_CMD, "query", "filetype", str(local_path)]
+    guess = run_command(args, timeout).strip()
     return guess if guess != "" else None
@@ -0,0 +1,91 @@
+"""
+compression
+
+Bounded, incremental decompression of the beginning of compressed streams,
+allowing the type of the compressed content to be detected
+without ever inflating the whole stream.
+"""
+
+#pylint:disable=wildcard-import,unused-wildcard-import,pointless-string-statement
+
+import zlib
+import bz2
+import lzma
+
+from .typings import *
+from .signatures import MAGIC_SIGNATURES, signature_matches
+
+"""
+The supported compression formats, as their mime type,
+mapped to the name of their encoding (matching the names used by mimetypes.guess_type)
+and a factory for a new decompressor object.
+"""
+COMPRESSION_FORMATS: Dict[str, Tuple[str, Callable[[], Any]]] = {
+    "application/gzip": ("gzip", lambda: zlib.decompressobj(16 + zlib.MAX_WBITS)),
+    "application/x-bzip2": ("bzip2", bz2.BZ2Decompressor),
+    "application/x-xz": ("xz", lambda: lzma.LZMADecompressor(lzma.FORMAT_XZ)),
+}
+
+"""The maximum amount of decompressed bytes produced for detection."""
+MAX_DECOMPRESSED_SIZE:int = 16 * 1024
+"""
+The maximum amount of compressed bytes read while trying to produce the decompressed bytes.
+bzip2 only produces output once a whole block (up to 900KB) is read, hence the size.
+"""
+MAX_COMPRESSED_SIZE:int = 1024 * 1024
+"""The size of the chunks compressed bytes are read in."""
+COMPRESSED_CHUNK_SIZE:int = 16 * 1024
+
+def compression_format_from_head(head:bytes) -> Union[str, None]:
+    """
+    compression_format_from_head
+    Gets the compression format of some content from its first bytes.
+
+    Arguments:
+        head - The first bytes of the content.
+
+    Returns:
+        The mime type string of the compression format if it is supported, otherwise None.
+    """
+    for mime in COMPRESSION_FORMATS:
+        for signature in MAGIC_SIGNATURES[mime]:
+            if signature_matches(head, signature):
+                return mime
+    return None
+
+def decompress_head(read:Callable[[int], bytes],
+                    compression_format:str,
+                    max_size:int = MAX_DECOMPRESSED_SIZE
+                   ) -> bytes:
+    """
+    decompress_head
+    Incrementally decompresses the beginning of a compressed stream,
+    stopping as soon as max_size bytes were produced.
+
+    Arguments:
+        read - A function reading up to the given amount of compressed bytes,
+            returning an empty bytes object at the end of the stream.
+        compression_format - The mime type string of the compression format,
+            a key of COMPRESSION_FORMATS.
+        max_size - The maximum amount of decompressed bytes to produce.
+
+    Returns:
+        Up to max_size decompressed bytes.
+        This may be less even if the stream is longer,
+        if MAX_COMPRESSED_SIZE bytes did not decompress into enough data, or the stream is corrupt.
+    """
+    decompressor = COMPRESSION_FORMATS[compression_format][1]()
+    output = bytearray()
+    consumed = 0
+    while len(output) < max_size and consumed < MAX_COMPRESSED_SIZE:
+        chunk = read(COMPRESSED_CHUNK_SIZE)
+        if len(chunk) == 0:
+            break
+        consumed += len(chunk)
+        try:
+            output += decompressor.decompress(chunk, max_size - len(output))
+        except (zlib.error, OSError, EOFError, lzma.LZMAError):
+            break
+        if decompressor.eof:
+            break
+    return bytes(output[:max_size])
@@ -0,0 +1,360 @@
+"""
+consensus
+
+Confidence scored detection, running several detection backends on one shared read
+of the content and combining their answers into ranked candidates.
+Answers support every candidate they are a more specific kind of,
+so that 'application/json' from one backend and 'text/plain' from another agree on the former.
+Answers of definitive backends rule out any type more specific than them.
+"""
+
+#pylint:disable=wildcard-import,unused-wildcard-import,pointless-string-statement,unused-argument
+
+from .typings import *
+from .mimetypecheckers import *
+
+"""The amount of bytes read from the start of the content, shared by all backends."""
+CONSENSUS_READ_SIZE:int = 64 * 1024
+
+class Sample(NamedTuple):
+    """
+    Sample
+
+    The shared read of the content that every backend detects from.
+    """
+
+    """The first bytes of the content, at most CONSENSUS_READ_SIZE."""
+    head: bytes
+    """True if the head may be only the start of the content."""
+    partial: bool
+    """The local path to the content (or a hint of its name), or None if not known."""
+    path: Union[str, None]
+    """The full content if it is in memory, otherwise None."""
+    data: Union[bytes, None]
+
+def container_backend(sample:Sample, strict:bool) -> Union[str, None]:
+    """
+    container_backend
+    Looks inside zip based containers, see containers.mime_string_from_container_path.
+    """
+    if not is_zip_head(sample.head):
+        return None
+    if sample.data is not None:
+        return mime_string_from_container_data(sample.data)
+    if sample.path is not None:
+        return mime_string_from_container_path(sample.path)
+    return None
+
+def magic_backend(sample:Sample, strict:bool) -> Union[str, None]:
+    """
+    magic_backend
+    Runs the 'magic' module (if imported) on the head of the content.
+    """
+    if not MAGICMIME_AVAILABLE or len(sample.head) == 0:
+        return None
+    guess = thread_magic().from_buffer(sample.head).strip()
+    return guess if guess != "" else None
+
+def puremagic_backend(sample:Sample, strict:bool) -> Union[str, None]:
+    """
+    puremagic_backend
+    Runs the 'puremagic' module (if imported) on the head of the content.
+    """
+    if not PUREMAGICMIME_AVAILABLE or len(sample.head) == 0:
+        return None
+    try:
+        guess = puremagic_from_buffer(sample.head, mime=True, filename=sample.path) #type:ignore
+    except PureError: #type:ignore
+        return None
+    guess = guess.strip()
+    return guess if guess != "" else None
+
+def signature_backend(sample:Sample, strict:bool) -> Union[str, None]:
+    """
+    signature_backend
+    Matches the known magic byte signatures, see signatures.mime_string_from_signature.
+    """
+    head = sample.head[:SIGNATURE_READ_SIZE]
+    return mime_string_from_signature(head, charset_from_data(head, partial=True) is not None)
+
+def text_backend(sample:Sample, strict:bool) -> Union[str, None]:
+    """
+    text_backend
+    Checks if the content is text, refining it to a type of XML from its doctype if possible.
+    """
+    if len(sample.head) == 0:
+        return None
+    charset = charset_from_data(sample.head, partial=sample.partial)
+    if charset is None:
+        return None
+    found = mime_string_from_xml_content(decode_head(sample.head, charset, partial=sample.partial))
+    return found if found is not None else "text/plain"
+
+def file_backend(sample:Sample, strict:bool) -> Union[str, None]:
+    """
+    file_backend
+    Runs the system's 'file' command (if found) on the local path of the content.
+    """
+    if sample.path is None or sample.data is not None:
+        return None
+    return file_cmd_mime_type_from_path(sample.path)
+
+def extension_backend(sample:Sample, strict:bool) -> Union[str, None]:
+    """
+    extension_backend
+    Guesses the type from the extension of the path (or name hint) of the content.
+    """
+    if sample.path is None:
+        return None
+    return extension_mime_string_from_path(sample.path, strict)
+
+"""The detection backends that can be combined, by name."""
+CONSENSUS_BACKENDS: Dict[str, Callable[[Sample, bool], Union[str, None]]] = {
+    "container": container_backend,
+    "magic": magic_backend,
+    "puremagic": puremagic_backend,
+    "signature": signature_backend,
+    "file": file_backend,
+    "text": text_backend,
+    "extension": extension_backend,
+}
+
+"""The backends run by default, in order of priority (which breaks ties between candidates)."""
+DEFAULT_CONSENSUS_BACKENDS: Tuple[str, ...] = (
+    "container", "magic", "puremagic", "signature", "text", "extension"
+)
+
+"""How much the answer of each backend is trusted, from 0 to 1."""
+DEFAULT_CONSENSUS_WEIGHTS: Dict[str, float] = {
+    "container": 1.0,
+    "magic": 0.9,
+    "file": 0.9,
+    "puremagic": 0.8,
+    "signature": 0.8,
+    "extension": 0.5,
+    "text": 0.3,
+}
+
+"""
+Backends whose answers are definitive, ruling out any more specific type.
+The container backend read the whole central directory, so a plain 'application/zip'
+means that the content is no known kind of zip (such as a document renamed to '.docx').
+"""
+DEFINITIVE_CONSENSUS_BACKENDS: Tuple[str, ...] = ("container",)
+
+"""The weight of backends missing from the given weights."""
+DEFAULT_BACKEND_WEIGHT:float = 0.5
+
+"""
+The weight from which a backend is considered high confidence.
+Once the first high confidence backend agrees with the extension, no further backends are run.
+"""
+HIGH_CONFIDENCE_WEIGHT:float = 0.8
+
+def mime_strings_agree(first:str, second:str) -> bool:
+    """
+    mime_strings_agree
+    Checks if two mime types agree, being the same type or one being a kind of the other.
+    The root type only agrees with itself, as it is what backends answer when they found nothing.
+
+    Arguments:
+        first - A mime type string, without parameters.
+        second - Another mime type string, without parameters.
+
+    Returns:
+        True if either type is in the lineage of the other.
+    """
+    if first == second:
+        return True
+    if ROOT_MIME_STRING in (first, second):
+        return False
+    return first in mime_string_lineage(second) or second in mime_string_lineage(first)
+
+class Candidate(NamedTuple):
+    """
+    Candidate
+
+    A single candidate type of a DetectionResult.
+    """
+
+    """The candidate mime type string."""
+    mime: str
+    """The share of the weight of all answering backends supporting this type, from 0 to 1."""
+    score: float
+    """The names of the backends whose answer is this type or one of its parent types."""
+    support: Tuple[str, ...]
+
+class DetectionResult():
+    """
+    DetectionResult
+
+    The combined answers of several detection backends, as candidates ranked by their score.
+    Each answer supports its own type and every more specific type it is a parent of,
+    so more specific types win over the generic types they agree with.
+    Answers of the root type only support the root type itself,
+    and answers of DEFINITIVE_CONSENSUS_BACKENDS rule out the more specific types.
+    """
+
+    def __init__(self,
+                 votes:Dict[str, str],
+                 weights:Union[Dict[str, float], None] = None,
+                 *,
+                 exited_early:bool = False
+                ):
+        """
+        __init__ Combines the given answers of backends.
+
+        Keyword Arguments:
+            votes -- The answer of each backend that found a type, in order of priority.
+            weights -- The weight of each backend, DEFAULT_CONSENSUS_WEIGHTS if None.
+                Backends without a weight count as DEFAULT_BACKEND_WEIGHT.
+            exited_early -- True if not all backends were run, see HIGH_CONFIDENCE_WEIGHT.
+        """
+        if weights is None:
+            weights = DEFAULT_CONSENSUS_WEIGHTS
+        self.votes:Dict[str, str] = {backend: split_parameters(mime)[0].strip().lower()
+                                     for backend, mime in votes.items()}
+        self.exited_early = exited_early
+
+        total = sum(weights.get(backend, DEFAULT_BACKEND_WEIGHT) for backend in self.votes)
+        ranked:List[Tuple[float, int, int, Candidate]] = []
+        for priority, mime in enumerate(dict.fromkeys(self.votes.values())):
+            lineage = mime_string_lineage(mime)
+            if any(vote != mime and vote in lineage for backend, vote in self.votes.items()
+                   if backend in DEFINITIVE_CONSENSUS_BACKENDS):
+                continue
+            support = tuple(backend for backend, vote in self.votes.items()
+                            if vote == mime or (vote != ROOT_MIME_STRING and vote in lineage))
+            weight = sum(weights.get(backend, DEFAULT_BACKEND_WEIGHT) for backend in support)
+            score = weight / total if total > 0 else 0.0
+            #rounded, so that equal sums added up in a different order still tie
+            ranked.append((-round(score, 9), -len(lineage), priority,
+                           Candidate(mime, score, support)))
+        ranked.sort()
+        self.candidates:List[Candidate] = [candidate for *_, candidate in ranked]
+
+    @property
+    def mime(self) -> Union[str, None]:
+        """
+        mime
+        The mime type string of the best candidate, or None if no backend found a type.
+        """
+        return self.candidates[0].mime if len(self.candidates) > 0 else None
+
+    @property
+    def score(self) -> float:
+        """
+        score
+        The score of the best candidate, 0 if no backend found a type.
+        """
+        return self.candidates[0].score if len(self.candidates) > 0 else 0.0
+
+    def __repr__(self) -> str:
+        return f"DetectionResult({self.candidates!r}, exited_early={self.exited_early!r})"
+
+    @staticmethod
+    def from_sample(sample:Sample,
+                    strict:bool = False,
+                    *,
+                    backends:Union[Iterable[str], None] = None,
+                    weights:Union[Dict[str, float], None] = None,
+                    early_exit:bool = True
+                   ) -> 'DetectionResult':
+        """
+        from_sample
+        Runs the given backends on a shared read of the content and combines their answers.
+
+        Arguments:
+            sample - The shared read of the content.
+            strict - Allow for non standard types to be included in some types of checking.
+            backends - The names of the backends to run (from CONSENSUS_BACKENDS)
+                in order of priority, DEFAULT_CONSENSUS_BACKENDS if None.
+            weights - The weight of each backend, DEFAULT_CONSENSUS_WEIGHTS if None.
+            early_exit - Stop once the first high confidence backend agrees with the extension.
+
+        Returns:
+            The DetectionResult.
+        """
+        backends = tuple(backends) if backends is not None else DEFAULT_CONSENSUS_BACKENDS
+        weights = weights if weights is not None else DEFAULT_CONSENSUS_WEIGHTS
+        for backend in backends:
+            if backend not in CONSENSUS_BACKENDS:
+                raise ValueError(f"unknown detection backend '{backend}'")
+
+        #the extension is practically free, so it is checked first to allow for exiting early
+        votes:Dict[str, str] = {}
+        extension:Union[str, None] = None
+        if "extension" in backends:
+            extension = extension_backend(sample, strict)
+
+        confident = False
+        for backend in backends:
+            if backend == "extension":
+                mime = extension
+            else:
+                mime = CONSENSUS_BACKENDS[backend](sample, strict)
+            if mime is None:
+                continue
+            votes[backend] = mime
+            if (early_exit and not confident and backend != "extension"
+                and weights.get(backend, DEFAULT_BACKEND_WEIGHT) >= HIGH_CONFIDENCE_WEIGHT):
+                confident = True
+                vote = split_parameters(mime)[0].strip().lower()
+                #definitive answers only agree with the same type, or a parent of it
+                if extension is not None and (
+                    extension.lower() in mime_string_lineage(vote)
+                    if backend in DEFINITIVE_CONSENSUS_BACKENDS
+                    else mime_strings_agree(vote, extension.lower())
+                ):
+                    votes["extension"] = extension
+                    skipped = backends[backends.index(backend) + 1:]
+                    return DetectionResult(votes, weights, exited_early = any(
+                        skip != "extension" for skip in skipped
+                    ))
+        return DetectionResult(votes, weights)
+
+    @staticmethod
+    def from_path(path:Union[str, PathLike, Path],
+                  strict:bool = False,
+                  **options:Any
+                 ) -> 'DetectionResult':
+        """
+        from_path
+        Runs several backends on the file at the given local path, reading it only once.
+
+        Arguments:
+            path - The local path to the file.
+            strict - Allow for non standard types to be included in some types of checking.
+            options - See from_sample.
+
+        Returns:
+            The DetectionResult.
+        """
+        head = read_head(path, CONSENSUS_READ_SIZE)
+        sample = Sample(head, len(head) == CONSENSUS_READ_SIZE, fspath(path), None)
+        return DetectionResult.from_sample(sample, strict, **options)
+
+    @staticmethod
+    def from_data(buffer:bytes,
+                  strict:bool = False,
+                  *,
+                  hint_path:Union[str, PathLike, None] = None,
+                  **options:Any
+                 ) -> 'DetectionResult':
+        """
+        from_data
+        Runs several backends on the given content.
+
+        Arguments:
+            buffer - The full content as bytes.
+            strict - Allow for non standard types to be included in some types of checking.
+            hint_path - A optional path (or name) of the content, used by the extension backend.
+            options - See from_sample.
+
+        Returns:
+            The DetectionResult.
+        """
+        buffer = bytes(buffer)
+        sample = Sample(buffer[:CONSENSUS_READ_SIZE], len(buffer) > CONSENSUS_READ_SIZE,
+                        fspath(hint_path) if hint_path is not None else None, buffer)
+        return DetectionResult.from_sample(sample, strict, **options)
@@ -0,0 +1,138 @@
+"""
+containers
+
+Container aware mime type detection for zip based formats
+(such as OOXML and ODF documents, EPUB books, and JAR and APK archives).
+Only the end of central directory record, the central directory,
+and at most one small stored member are ever read, nothing is decompressed.
+"""
+
+#pylint:disable=wildcard-import,unused-wildcard-import,pointless-string-statement
+
+from io import BytesIO
+from zipfile import ZipFile, BadZipFile, ZIP_STORED
+
+from .typings import *
+from .signatures import MAGIC_SIGNATURES, signature_matches
+
+"""The largest stored 'mimetype' member that will be read, in bytes."""
+MAX_MIMETYPE_MEMBER_SIZE:int = 256
+
+"""The mime type reported for zip archives that are not a more specific format."""
+ZIP_MIME_STRING:LiteralString = "application/zip"
+
+"""
+Top level directories of OOXML packages (identified by a '[Content_Types].xml' member),
+and the mime type of the package they indicate.
+"""
+OOXML_DIRECTORIES: Dict[str, str] = {
+    "word": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "xl": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "ppt": "application/vnd.openxmlformats-officedocument.presentationml.presentation",
+}
+
+def is_zip_head(head:bytes) -> bool:
+    """
+    is_zip_head
+    Checks if the given beginning of some content is the start of a zip archive.
+
+    Arguments:
+        head - The first bytes of the content.
+
+    Returns:
+        True if the content starts with a zip signature.
+    """
+    for signature in MAGIC_SIGNATURES[ZIP_MIME_STRING]:
+        if signature_matches(head, signature):
+            return True
+    return False
+
+def mime_string_from_zip_names(names:Iterable[str]) -> str:
+    """
+    mime_string_from_zip_names
+    Gets the mime type of a zip archive from the names of its members alone.
+
+    Arguments:
+        names - The names of the members, as stored in the central directory.
+
+    Returns:
+        String with the most precise mimetype the names indicate.
+    """
+    names = set(names)
+    if "[Content_Types].xml" in names:
+        for name in names:
+            directory = name.split("/", 1)[0]
+            if directory in OOXML_DIRECTORIES:
+                return OOXML_DIRECTORIES[directory]
+    if "AndroidManifest.xml" in names and "classes.dex" in names:
+        return "application/vnd.android.package-archive"
+    if "META-INF/container.xml" in names:
+        return "application/epub+zip"
+    if "META-INF/MANIFEST.MF" in names:
+        return "application/java-archive"
+    return ZIP_MIME_STRING
+
+def mime_string_from_zip_stream(stream:Any) -> Union[str, None]:
+    """
+    mime_string_from_zip_stream
+    Gets the mime type of the zip archive in the given stream,
+    reading only its central directory and, where needed, a small stored 'mimetype' member.
+
+    Arguments:
+        stream - A seekable binary file like object containing a zip archive.
+
+    Returns:
+        String with the most precise mimetype if the stream is a readable zip archive,
+        otherwise None.
+    """
+    try:
+        with ZipFile(stream) as archive:
+            infos = archive.infolist()
+            for info in infos:
+                if (info.filename == "mimetype"
+                    and info.compress_type == ZIP_STORED
+                    and info.file_size <= MAX_MIMETYPE_MEMBER_SIZE):
+                    declared = archive.read(info).decode("ascii").strip().lower()
+                    if declared.count("/") == 1:
+                        return declared
+                    break
+            return mime_string_from_zip_names(info.filename for info in infos)
+    except (BadZipFile, OSError, ValueError, EOFError, UnicodeDecodeError, KeyError):
+        return None
+
+def mime_string_from_container_path(path:Union[str, PathLike, Path]) -> Union[str, None]:
+    """
+    mime_string_from_container_path
+    Gets the precise mime type of the zip based file at the given local path.
+
+    Arguments:
+        path - The local path to the file.
+
+    Returns:
+        String with the most precise mimetype if the file is a readable zip archive,
+        otherwise None.
+    """
+    try:
+        with open(path, "rb") as f:
+            if not is_zip_head(f.read(4)):
+                return None
+            f.seek(0)
+            return mime_string_from_zip_stream(f)
+    except (OSError, TypeError, ValueError):
+        return None
+
+def mime_string_from_container_data(buffer:bytes) -> Union[str, None]:
+    """
+    mime_string_from_container_data
+    Gets the precise mime type of the given zip based content.
+
+    Arguments:
+        buffer - The full content.
+
+    Returns:
+        String with the most precise mimetype if the content is a readable zip archive,
+        otherwise None.
+    """
+    if not is_zip_head(buffer[:4]):
+        return None
+    return mime_string_from_zip_stream(BytesIO(buffer))
@@ -0,0 +1,282 @@
+"""
+index
+
+A persistent, incrementally updated index of the mime types of the files in directory trees,
+stored in a SQLite database.
+Rescanning a tree only runs detection for files whose stat changed since the last scan.
+"""
+
+#pylint:disable=wildcard-import,unused-wildcard-import,pointless-string-statement
+
+import os
+import sqlite3
+from subprocess import CalledProcessError
+
+from .typings import *
+from .mimetypecheckers import mime_string_and_detector_from_path
+from .tools import split_parameters
+
+"""The schema of the index database."""
+INDEX_SCHEMA:LiteralString = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    device INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    ctime_ns INTEGER NOT NULL,
+    mime TEXT,
+    detector TEXT,
+    extension TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_mime ON files (mime);
+CREATE INDEX IF NOT EXISTS files_extension ON files (extension);
+"""
+
+class IndexEntry(NamedTuple):
+    """
+    IndexEntry
+
+    A single indexed file.
+    """
+
+    """The absolute path of the file."""
+    path: str
+    """The detected mime type string, or None if no type was detected."""
+    mime: Union[str, None]
+    """The name of the detector that found the type, or None if no type was detected."""
+    detector: Union[str, None]
+    """The size of the file in bytes, when it was detected."""
+    size: int
+    """The modification time of the file in nanoseconds, when it was detected."""
+    mtime_ns: int
+
+class IndexUpdate(NamedTuple):
+    """
+    IndexUpdate
+
+    The counts of what a single MimeIndex.update did.
+    """
+
+    """The amount of files found in the tree."""
+    scanned: int
+    """The amount of files that were new or changed, and so detected again."""
+    detected: int
+    """The amount of files that no longer exist and were dropped from the index."""
+    removed: int
+
+def extension_of(path:str) -> str:
+    """
+    extension_of
+    Gets the extension of a path, as stored in the index.
+
+    Arguments:
+        path - The path.
+
+    Returns:
+        The lowercase extension without the leading '.', or a blank string if there is none.
+    """
+    return os.path.splitext(path)[1].lstrip(".").lower()
+
+class MimeIndex():
+    """
+    MimeIndex
+
+    A persistent index of the mime types of the files in directory trees.
+    """
+
+    def __init__(self, database:Union[str, PathLike] = ":memory:", strict:bool = False):
+        """
+        __init__ Opens (or creates) an index.
+
+        Keyword Arguments:
+            database -- The path to the SQLite database file, or ':memory:' for a temporary index.
+            strict -- Allow for non standard types to be included in some types of checking.
+        """
+        self.strict = strict
+        self.__connection = sqlite3.connect(str(database))
+        self.__connection.executescript(INDEX_SCHEMA)
+
+    def close(self):
+        """
+        close
+        Closes the index database.
+        """
+        self.__connection.close()
+
+    def __enter__(self) -> 'MimeIndex':
+        return self
+
+    def __exit__(self, *exc_info:Any):
+        self.close()
+
+    def update(self, root:Union[str, PathLike]) -> IndexUpdate:
+        """
+        update
+        Rescans the given directory tree (or single file),
+        detecting only the files whose stat changed and dropping files that no longer exist.
+        Symbolic links to directories are not followed.
+
+        Arguments:
+            root - The root of the tree.
+
+        Returns:
+            An IndexUpdate with the counts of what was done.
+        """
+        root = os.path.abspath(root)
+        known:Dict[str, Tuple[int, ...]] = {}
+        if os.path.isdir(root):
+            query = ("SELECT path, device, inode, size, mtime_ns, ctime_ns FROM files"
+                     " WHERE path >= ? AND path < ?")
+            for row in self.__connection.execute(query, MimeIndex.subtree_range(root)):
+                known[row[0]] = tuple(row[1:])
+        row = self.__connection.execute(
+            "SELECT path, device, inode, size, mtime_ns, ctime_ns FROM files WHERE path = ?",
+            (root,)
+        ).fetchone()
+        if row is not None:
+            known[row[0]] = tuple(row[1:])
+
+        scanned = 0
+        changed:List[Tuple[Any, ...]] = []
+        seen = set()
+        for path, stat in MimeIndex.scan(root):
+            scanned += 1
+            seen.add(path)
+            signature = (stat.st_dev, stat.st_ino, stat.st_size,
+                         stat.st_mtime_ns, stat.st_ctime_ns)
+            if known.get(path) == signature:
+                continue
+            try:
+                #the index records the detector itself, which the detection cache does not keep
+                mime, detector = mime_string_and_detector_from_path(path, self.strict,
+                                                                    use_cache=False)
+            except (OSError, ValueError, CalledProcessError):
+                mime, detector = None, None
+            changed.append((path, *signature, mime, detector, extension_of(path)))
+        removed = [(path,) for path in known if path not in seen]
+
+        with self.__connection:
+            self.__connection.executemany(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", changed
+            )
+            self.__connection.executemany("DELETE FROM files WHERE path = ?", removed)
+        return IndexUpdate(scanned, len(changed), len(removed))
+
+    @staticmethod
+    def subtree_range(root:str) -> Tuple[str, str]:
+        """
+        subtree_range
+        Gets the range of path strings that are inside the given directory.
+
+        Arguments:
+            root - The absolute path of the directory.
+
+        Returns:
+            A tuple of the inclusive lower and exclusive upper bound.
+        """
+        prefix = root.rstrip(os.sep) + os.sep
+        return prefix, prefix[:-1] + chr(ord(os.sep) + 1)
+
+    @staticmethod
+    def scan(root:str) -> Iterable[Tuple[str, os.stat_result]]:
+        """
+        scan
+        Walks the given directory tree using os.scandir.
+
+        Arguments:
+            root - The absolute path of the tree (or of a single file).
+
+        Returns:
+            An iterable of the path and stat of every file in the tree.
+        """
+        if not os.path.isdir(root):
+            if os.path.isfile(root):
+                yield root, os.stat(root)
+            return
+        directories = [root]
+        while len(directories) > 0:
+            try:
+                with os.scandir(directories.pop()) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                directories.append(entry.path)
+                            elif entry.is_file():
+                                yield entry.path, entry.stat()
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+
+    def entry(self, path:Union[str, PathLike]) -> Union[IndexEntry, None]:
+        """
+        entry
+        Gets the indexed entry of a file.
+
+        Arguments:
+            path - The path of the file.
+
+        Returns:
+            The IndexEntry, or None if the file is not indexed.
+        """
+        row = self.__connection.execute(
+            "SELECT path, mime, detector, size, mtime_ns FROM files WHERE path = ?",
+            (os.path.abspath(path),)
+        ).fetchone()
+        return IndexEntry(*row) if row is not None else None
+
+    def get(self, path:Union[str, PathLike]) -> Union[str, None]:
+        """
+        get
+        Gets the indexed mime type of a file.
+
+        Arguments:
+            path - The path of the file.
+
+        Returns:
+            The mime type string, or None if the file is not indexed or has no detected type.
+        """
+        entry = self.entry(path)
+        return entry.mime if entry is not None else None
+
+    def by_type(self, mime:Any) -> List[str]:
+        """
+        by_type
+        Gets the paths of all indexed files of the given mime type.
+
+        Arguments:
+            mime - The mime type (a string or MimeType object). Parameters are ignored.
+                A type with a wildcard subtype (such as 'image/' or 'image/*')
+                matches all files of that maintype.
+
+        Returns:
+            A list of the matching paths, sorted.
+        """
+        mime = split_parameters(str(mime))[0].strip().lower()
+        query = "SELECT path FROM files WHERE mime = ? ORDER BY path"
+        arguments:Tuple[str, ...] = (mime,)
+        if mime.endswith("/") or mime.endswith("/*"):
+            maintype = mime[:mime.index("/") + 1]
+            query = "SELECT path FROM files WHERE mime >= ? AND mime < ? ORDER BY path"
+            arguments = (maintype, maintype[:-1] + chr(ord("/") + 1))
+        return [row[0] for row in self.__connection.execute(query, arguments)]
+
+    def by_extension(self, extension:str) -> List[str]:
+        """
+        by_extension
+        Gets the paths of all indexed files with the given extension.
+
+        Arguments:
+            extension - The extension, with or without the leading '.'. Case insensitive.
+
+        Returns:
+            A list of the matching paths, sorted.
+        """
+        return [row[0] for row in self.__connection.execute(
+            "SELECT path FROM files WHERE extension = ? ORDER BY path",
+            (extension.lstrip(".").lower(),)
+        )]
+
+    def __len__(self) -> int:
+        return self.__connection.execute("SELECT COUNT(*) FROM files").fetchone()[0]
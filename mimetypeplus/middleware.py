@@ -0,0 +1,400 @@
+"""
+middleware
+
+WSGI and ASGI middleware correcting the 'Content-Type' of responses.
+Only the first body chunks (up to a byte cap) are buffered and sniffed,
+the rest of the body is streamed through unchanged.
+Responses that already carry a trustworthy type are passed through untouched,
+and sniffing never upgrades a response to a type that browsers run scripts in.
+"""
+
+#pylint:disable=wildcard-import,unused-wildcard-import,pointless-string-statement
+
+from collections import OrderedDict
+from threading import Lock
+
+from .typings import *
+from .mimetypeplus import MimeType
+from .mimetypecheckers import mime_string_from_data
+
+"""Declared types that are not trusted, and so are sniffed (lowercase, without parameters)."""
+UNTRUSTED_CONTENT_TYPES: Tuple[str, ...] = (
+    "",
+    "application/octet-stream",
+    "binary/octet-stream",
+    "application/unknown",
+    "unknown/unknown",
+)
+
+"""Types that sniffing never upgrades a response to, as browsers run scripts in them."""
+SCRIPTABLE_CONTENT_TYPES: Tuple[str, ...] = (
+    "text/html",
+    "text/xml",
+    "application/xml",
+    "application/xhtml+xml",
+    "image/svg+xml",
+)
+
+"""The default maximum amount of body bytes buffered for sniffing."""
+DEFAULT_SNIFF_SIZE:int = 4 * 1024
+"""The default amount of (route, ETag) pairs whose sniffed types are cached."""
+DEFAULT_CACHE_SIZE:int = 4 * 1024
+
+class ContentTypeSniffer():
+    """
+    ContentTypeSniffer
+
+    The sniffing and caching shared by the WSGI and ASGI middleware.
+    """
+
+    def __init__(self,
+                 *,
+                 sniff_size:int = DEFAULT_SNIFF_SIZE,
+                 nosniff:bool = False,
+                 untrusted_types:Iterable[str] = UNTRUSTED_CONTENT_TYPES,
+                 cache_size:int = DEFAULT_CACHE_SIZE
+                ):
+        """
+        __init__ Creates a content type sniffer.
+
+        Keyword Arguments:
+            sniff_size -- The maximum amount of body bytes buffered for sniffing.
+            nosniff -- If true, 'X-Content-Type-Options: nosniff' is added to every response.
+            untrusted_types -- The declared types that are sniffed (without parameters),
+                a blank string standing for a missing 'Content-Type'.
+            cache_size -- The amount of (route, ETag) pairs whose sniffed types are cached.
+        """
+        self.sniff_size = sniff_size
+        self.nosniff = nosniff
+        self.untrusted_types = frozenset(mime.strip().lower() for mime in untrusted_types)
+        self.cache_size = cache_size
+        self.__cache:'OrderedDict[Tuple[str, str], str]' = OrderedDict()
+        self.__cache_lock = Lock()
+
+    def is_trusted(self, declared:str) -> bool:
+        """
+        is_trusted
+        Checks if a declared content type is trusted as is.
+
+        Arguments:
+            declared - The declared 'Content-Type' value, a blank string if missing.
+
+        Returns:
+            True if the response does not need to be sniffed.
+        """
+        return declared.split(";", 1)[0].strip().lower() not in self.untrusted_types
+
+    def sniff(self, prefix:bytes, declared:str, complete:bool) -> str:
+        """
+        sniff
+        Gets the corrected content type of a response from the start of its body.
+
+        Arguments:
+            prefix - The start of the body.
+            declared - The declared 'Content-Type' value, a blank string if missing.
+            complete - True if the prefix is the whole body.
+
+        Returns:
+            The 'Content-Type' value to use, the declared value if it can not be improved upon
+            (or if it would be upgraded to one of the SCRIPTABLE_CONTENT_TYPES).
+        """
+        if len(prefix) == 0:
+            return declared
+        sniffed = mime_string_from_data(prefix, partial = not complete)
+        if sniffed is None:
+            return declared
+        corrected = MimeType(sniffed)
+        if f"{corrected.maintype}/{corrected.subtype}".lower() in SCRIPTABLE_CONTENT_TYPES:
+            #serving untrusted uploads as html (or svg, or xml) would allow stored xss
+            return declared
+        if declared != "":
+            original = MimeType(declared)
+            if corrected == original and original.charset != "":
+                return declared
+            if corrected.maintype == "text" and original.charset != "":
+                corrected.charset = original.charset
+        return str(corrected)
+
+    def cached(self, route:str, etag:str) -> Union[str, None]:
+        """
+        cached
+        Gets the cached content type of a response.
+
+        Arguments:
+            route - The route of the request.
+            etag - The 'ETag' of the response, a blank string if missing (which is never cached).
+
+        Returns:
+            The cached 'Content-Type' value, or None if not cached.
+        """
+        if etag == "":
+            return None
+        with self.__cache_lock:
+            found = self.__cache.get((route, etag), None)
+            if found is not None:
+                self.__cache.move_to_end((route, etag))
+            return found
+
+    def remember(self, route:str, etag:str, content_type:str):
+        """
+        remember
+        Caches the content type of a response, evicting the least recently used entry if full.
+
+        Arguments:
+            route - The route of the request.
+            etag - The 'ETag' of the response, a blank string if missing (which is never cached).
+            content_type - The 'Content-Type' value to cache.
+        """
+        if etag == "" or self.cache_size <= 0:
+            return
+        with self.__cache_lock:
+            self.__cache[(route, etag)] = content_type
+            self.__cache.move_to_end((route, etag))
+            while len(self.__cache) > self.cache_size:
+                self.__cache.popitem(last=False)
+
+class WSGIContentTypeMiddleware(ContentTypeSniffer):
+    """
+    WSGIContentTypeMiddleware
+
+    WSGI middleware correcting the 'Content-Type' of responses by sniffing the start of their body.
+    """
+
+    def __init__(self, app:Callable[..., Any], **options:Any):
+        """
+        __init__ Wraps a WSGI application.
+
+        Keyword Arguments:
+            app -- The WSGI application.
+            options -- See ContentTypeSniffer.
+        """
+        super().__init__(**options)
+        self.app = app
+
+    def headers_with(self,
+                     headers:List[Tuple[str, str]],
+                     content_type:str
+                    ) -> List[Tuple[str, str]]:
+        """
+        headers_with
+        Sets the 'Content-Type' (and 'X-Content-Type-Options' if enabled) of the given headers.
+
+        Arguments:
+            headers - The WSGI response headers.
+            content_type - The 'Content-Type' value, a blank string to leave it unset.
+
+        Returns:
+            The changed headers.
+        """
+        changed = [(name, value) for name, value in headers
+                   if name.lower() != "content-type"
+                   and not (self.nosniff and name.lower() == "x-content-type-options")]
+        if content_type != "":
+            changed.append(("Content-Type", content_type))
+        if self.nosniff:
+            changed.append(("X-Content-Type-Options", "nosniff"))
+        return changed
+
+    def __call__(self,
+                 environ:Dict[str, Any],
+                 start_response:Callable[..., Any]
+                ) -> Iterable[bytes]:
+        route = environ.get("SCRIPT_NAME", "") + environ.get("PATH_INFO", "")
+        #the status, headers, exc_info, declared type and etag of the response,
+        #whether it was started, and the write callable of the server once it was
+        pending:Dict[str, Any] = {"started": False}
+
+        def begin(content_type:str):
+            headers = self.headers_with(pending["headers"], content_type)
+            pending["write"] = start_response(pending["status"], headers, *pending["exc_info"])
+            pending["started"] = True
+
+        def write(data:bytes) -> Any:
+            #legacy write() calls can not be sniffed, so the declared type is kept
+            if not pending["started"]:
+                begin(pending["declared"])
+            return pending["write"](data)
+
+        def capture(status:str, headers:List[Tuple[str, str]], exc_info:Any = None) -> Any:
+            if pending["started"]:
+                #only allowed with exc_info, let the server handle it
+                return start_response(status, headers, exc_info)
+            declared = ""
+            etag = ""
+            for name, value in headers:
+                lowered = name.lower()
+                if lowered == "content-type":
+                    declared = value
+                elif lowered == "etag":
+                    etag = value
+            pending.update(status = status,
+                           headers = headers,
+                           exc_info = (exc_info,) if exc_info is not None else (),
+                           declared = declared,
+                           etag = etag
+                          )
+            if self.is_trusted(declared):
+                begin(declared)
+            else:
+                cached = self.cached(route, etag)
+                if cached is not None:
+                    begin(cached)
+            return write
+
+        result = self.app(environ, capture)
+        if pending["started"]:
+            return result
+        return self.stream(result, route, pending, begin)
+
+    def stream(self,
+               result:Iterable[bytes],
+               route:str,
+               pending:Dict[str, Any],
+               begin:Callable[[str], Any]
+              ) -> Iterable[bytes]:
+        """
+        stream
+        Buffers the first chunks of a deferred response for sniffing,
+        then streams the whole response unchanged.
+
+        Arguments:
+            result - The iterable returned by the application.
+            route - The route of the request.
+            pending - The state of the response, see __call__.
+            begin - Starts the response with the given content type.
+
+        Returns:
+            An iterable of the body chunks.
+        """
+        buffered:List[bytes] = []
+        size = 0
+        try:
+            for chunk in result:
+                if pending["started"]:
+                    if len(buffered) > 0:
+                        yield b"".join(buffered)
+                        buffered = []
+                    yield chunk
+                    continue
+                buffered.append(chunk)
+                size += len(chunk)
+                if size >= self.sniff_size and "status" in pending:
+                    prefix = b"".join(buffered)[:self.sniff_size]
+                    content_type = self.sniff(prefix, pending["declared"], False)
+                    self.remember(route, pending["etag"], content_type)
+                    begin(content_type)
+                    yield b"".join(buffered)
+                    buffered = []
+            if not pending["started"] and "status" in pending:
+                content_type = self.sniff(b"".join(buffered), pending["declared"], True)
+                self.remember(route, pending["etag"], content_type)
+                begin(content_type)
+            if len(buffered) > 0:
+                yield b"".join(buffered)
+        finally:
+            close = getattr(result, "close", None)
+            if close is not None:
+                close()
+
+class ASGIContentTypeMiddleware(ContentTypeSniffer):
+    """
+    ASGIContentTypeMiddleware
+
+    ASGI middleware correcting the 'Content-Type' of responses by sniffing the start of their body.
+    """
+
+    def __init__(self, app:Callable[..., Any], **options:Any):
+        """
+        __init__ Wraps an ASGI application.
+
+        Keyword Arguments:
+            app -- The ASGI application.
+            options -- See ContentTypeSniffer.
+        """
+        super().__init__(**options)
+        self.app = app
+
+    def start_with(self, message:Dict[str, Any], content_type:str) -> Dict[str, Any]:
+        """
+        start_with
+        Sets the 'Content-Type' (and 'X-Content-Type-Options' if enabled)
+        of a 'http.response.start' message.
+
+        Arguments:
+            message - The ASGI message.
+            content_type - The 'Content-Type' value, a blank string to leave it unset.
+
+        Returns:
+            The changed message.
+        """
+        headers = [(name, value) for name, value in message.get("headers", [])
+                   if name.lower() != b"content-type"
+                   and not (self.nosniff and name.lower() == b"x-content-type-options")]
+        if content_type != "":
+            headers.append((b"content-type", content_type.encode("latin-1")))
+        if self.nosniff:
+            headers.append((b"x-content-type-options", b"nosniff"))
+        return {**message, "headers": headers}
+
+    async def __call__(self,
+                       scope:Dict[str, Any],
+                       receive:Callable[..., Any],
+                       send:Callable[..., Any]
+                      ):
+        if scope.get("type") != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route = scope.get("root_path", "") + scope.get("path", "")
+        start:Dict[str, Any] = {}
+        declared = ""
+        etag = ""
+        buffered:List[bytes] = []
+        decided = False
+
+        async def flush(content_type:str, more_body:bool):
+            nonlocal decided
+            decided = True
+            await send(self.start_with(start, content_type))
+            if len(buffered) > 0 or not more_body:
+                await send({"type": "http.response.body",
+                            "body": b"".join(buffered),
+                            "more_body": more_body})
+
+        async def sniffing_send(message:Dict[str, Any]):
+            nonlocal start, declared, etag
+            if decided:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                for name, value in message.get("headers", []):
+                    lowered = name.lower()
+                    if lowered == b"content-type":
+                        declared = value.decode("latin-1")
+                    elif lowered == b"etag":
+                        etag = value.decode("latin-1")
+                start = message
+                if self.is_trusted(declared):
+                    await flush(declared, True)
+                else:
+                    cached = self.cached(route, etag)
+                    if cached is not None:
+                        await flush(cached, True)
+                return
+
+            if message["type"] == "http.response.body":
+                buffered.append(message.get("body", b""))
+                more_body = message.get("more_body", False)
+                prefix = b"".join(buffered)
+                if len(prefix) >= self.sniff_size or not more_body:
+                    content_type = self.sniff(prefix[:self.sniff_size], declared, not more_body)
+                    self.remember(route, etag, content_type)
+                    await flush(content_type, more_body)
+                return
+
+            #any other message (such as trailers) ends sniffing, keeping the declared type
+            await flush(declared, True)
+            await send(message)
+
+        await self.app(scope, receive, sniffing_send)
@@ -6,19 +6,40 @@ Type checker utilities for the MimeType module
 
 #pylint:disable=unused-import,wildcard-import,unused-wildcard-import,pointless-string-statement
 
+import mimetypes as mimetypes_module
+from base64 import b64decode
+from binascii import Error as BinasciiError
+from codecs import lookup as codecs_lookup
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from functools import lru_cache
+from io import BytesIO
+from os import stat as os_stat, fspath
+from posixpath import splitext as posix_splitext
+from subprocess import TimeoutExpired
+from threading import Thread, Lock, local
+from time import monotonic
+from types import MappingProxyType
+from urllib.parse import urlsplit, unquote_to_bytes
 from mimetypes import (
     guess_extension as guess_extension_text,
     guess_type as guess_type_path_URI,
     init as mimetypes_init
 )
 
+from .charsets import *
 from .cmds import *
+from .compression import *
+from .containers import *
+from .shmcache import *
+from .signatures import *
+from .tools import join_parameters, split_parameters
+from .tracing import span, traced, bind
 from .typings import *
 
 """True if the 'magic' module was imported."""
 MAGICMIME_AVAILABLE: bool  # DO NOT MODIFY, READ ONLY
 try:
-    from magic import from_buffer as magic_from_buffer, from_file as magic_from_path
+    from magic import Magic
     MAGICMIME_AVAILABLE = True
 except ImportError:
     MAGICMIME_AVAILABLE = False
@@ -34,7 +55,238 @@ try:
 except ImportError:
     PUREMAGICMIME_AVAILABLE = False
 
-mimetypes_init()
+#initializing again would reset the database while other threads may be reading it
+if not mimetypes_module.inited:
+    mimetypes_init()
+
+class ExtensionTables():
+    """
+    ExtensionTables
+
+    An immutable snapshot of the extension tables of the mimetypes module,
+    used for fast extension lookups that are safe to do from any amount of threads.
+    Snapshots compare (and hash) by identity, so they can key caches of their lookups.
+    """
+
+    __slots__ = ("types_strict", "types", "suffixes", "encodings",
+                 "extensions_strict", "extensions")
+
+    def __init__(self):
+        """
+        __init__ Takes a snapshot of the current tables of the mimetypes module.
+        """
+        self.types_strict:Any = MappingProxyType(dict(mimetypes_module.types_map))
+        self.types:Any = MappingProxyType({**mimetypes_module.common_types,
+                                           **mimetypes_module.types_map})
+        self.suffixes:Any = MappingProxyType(dict(mimetypes_module.suffix_map))
+        self.encodings:Any = MappingProxyType(dict(mimetypes_module.encodings_map))
+        #the extension mimetypes.guess_extension gives for each type, without the leading '.'
+        types = {mime.lower() for mime in (*mimetypes_module.types_map.values(),
+                                           *mimetypes_module.common_types.values())}
+        extensions:List[Dict[str, str]] = [{}, {}]
+        for index, strict in enumerate((True, False)):
+            for mime in types:
+                extension = guess_extension_text(mime, strict)
+                if extension is not None:
+                    extensions[index][mime] = extension.lstrip(".")
+        self.extensions_strict:Any = MappingProxyType(extensions[0])
+        self.extensions:Any = MappingProxyType(extensions[1])
+
+"""
+The current snapshot of the extension tables, replaced as a whole by refresh_extension_tables
+so that a lookup never mixes tables of different snapshots.
+"""
+EXTENSION_TABLES: ExtensionTables = ExtensionTables()
+
+def refresh_extension_tables():
+    """
+    refresh_extension_tables
+    Takes a new snapshot of the extension tables of the mimetypes module.
+    Only needed after changing its types (such as with mimetypes.add_type).
+    Lookups done concurrently see either the old or the new snapshot.
+    """
+    global EXTENSION_TABLES #pylint:disable=global-statement
+    EXTENSION_TABLES = ExtensionTables()
+    #lookups keyed on older snapshots can no longer be hit, so only free their memory
+    cached_mime_string_from_uri_path.cache_clear()
+
+def extension_from_mime_string(mime:str, strict:bool = False) -> Union[str, None]:
+    """
+    extension_from_mime_string
+    Gets the extension of a mime type the same way as mimetypes.guess_extension,
+    using the immutable snapshot tables.
+
+    Arguments:
+        mime - The mime type string, without parameters.
+        strict - If true, only standard types are included.
+
+    Returns:
+        The extension without the leading '.', or None if the type has no known extension.
+    """
+    tables = EXTENSION_TABLES
+    table = tables.extensions_strict if strict else tables.extensions
+    return table.get(mime.lower(), None)
+
+"""The maximum amount of normalized URI paths whose types are cached."""
+URI_CACHE_SIZE:int = 1 << 16
+
+def mime_string_and_encoding_from_uri_path(path:str,
+                                           strict:bool,
+                                           tables:Union[ExtensionTables, None] = None
+                                          ) -> Tuple[Union[str, None], Union[str, None]]:
+    """
+    mime_string_and_encoding_from_uri_path
+    Gets the mime type and encoding of a URI path (without any query or fragment)
+    from its extensions, following the same rules as mimetypes.guess_type,
+    using the immutable snapshot tables.
+
+    Arguments:
+        path - The path of the URI.
+        strict - If true, only standard types are included.
+        tables - The snapshot to look the extensions up in, the current EXTENSION_TABLES if None.
+
+    Returns:
+        A tuple of the mime type string if the extension is known (otherwise None),
+        and the name of the encoding (such as 'gzip') or None if there is none.
+    """
+    if tables is None:
+        tables = EXTENSION_TABLES
+    suffixes = tables.suffixes
+    base, ext = posix_splitext(path)
+    while ext.lower() in suffixes:
+        base, ext = posix_splitext(base + suffixes[ext.lower()])
+    encoding = tables.encodings.get(ext, None)
+    if encoding is not None:
+        base, ext = posix_splitext(base)
+    table = tables.types_strict if strict else tables.types
+    return table.get(ext.lower(), None), encoding
+
+def mime_string_from_uri_path(path:str,
+                              strict:bool,
+                              tables:Union[ExtensionTables, None] = None
+                             ) -> Union[str, None]:
+    """
+    mime_string_from_uri_path
+    Gets the mime type of a URI path (without any query or fragment) from its extension,
+    see mime_string_and_encoding_from_uri_path.
+
+    Arguments:
+        path - The path of the URI.
+        strict - If true, only standard types are included.
+        tables - The snapshot to look the extension up in, the current EXTENSION_TABLES if None.
+
+    Returns:
+        String with the mimetype if the extension is known, otherwise None.
+    """
+    return mime_string_and_encoding_from_uri_path(path, strict, tables)[0]
+
+@lru_cache(maxsize=URI_CACHE_SIZE)
+def cached_mime_string_from_uri_path(path:str,
+                                     strict:bool,
+                                     tables:ExtensionTables
+                                    ) -> Union[str, None]:
+    """
+    cached_mime_string_from_uri_path
+    mime_string_from_uri_path with its results cached per path and snapshot,
+    so that a lookup that started on an older snapshot never answers for a newer one.
+    """
+    return mime_string_from_uri_path(path, strict, tables)
+
+"""The amount of characters of a data URI payload decoded when sniffing it."""
+DATA_URI_SNIFF_SIZE:int = 4 * 1024
+
+def mime_string_from_data_uri(uri:str, sniff:bool = False) -> Union[str, None]:
+    """
+    mime_string_from_data_uri
+    Gets the mime type of a 'data:' URI from its header (RFC 2397),
+    optionally sniffing the start of its payload.
+
+    Arguments:
+        uri - The full data URI.
+        sniff - Decode the start of the payload (at most DATA_URI_SNIFF_SIZE characters of it)
+            and use its detected type, unless it is only detected as plain text or binary.
+
+    Returns:
+        String with the mimetype (including any parameters) if the URI is well formed,
+        otherwise None.
+    """
+    comma = uri.find(",")
+    if comma < 0:
+        return None
+    header = uri[len("data:"):comma]
+    is_base64 = header.lower().endswith(";base64")
+    if is_base64:
+        header = header[:-len(";base64")]
+    declared, parameters = split_parameters(header)
+    declared = declared.strip().lower()
+    if declared.count("/") != 1:
+        declared = "text/plain"
+        parameters.setdefault("charset", "us-ascii")
+    declared += join_parameters(parameters)
+
+    if not sniff:
+        return declared
+    payload = uri[comma+1:comma+1+DATA_URI_SNIFF_SIZE]
+    try:
+        if is_base64:
+            payload = "".join(payload.split())
+            content = b64decode(payload[:len(payload) - len(payload) % 4])
+        else:
+            #drop a percent escape cut off at the end of the payload
+            cut = payload.rfind("%", max(0, len(payload) - 2))
+            content = unquote_to_bytes(payload[:cut] if cut >= 0 else payload)
+    except (BinasciiError, ValueError):
+        return declared
+    sniffed = mime_string_from_data(content, partial = len(uri) - comma - 1 > DATA_URI_SNIFF_SIZE)
+    if sniffed is None or split_parameters(sniffed)[0] in ("text/plain", ROOT_MIME_STRING):
+        return declared
+    return sniffed
+
+def mime_string_from_uri(uri:Union[str, PathLike],
+                         strict:bool = False,
+                         *,
+                         sniff_data:bool = False
+                        ) -> Union[str, None]:
+    """
+    mime_string_from_uri
+    Gets the mime type of the given URI without touching the local filesystem.
+    The query and fragment are ignored, 'data:' URIs are answered from their header,
+    and other URIs from the extension of their path.
+
+    Arguments:
+        uri - The URI (or a path).
+        strict - Allow for non standard types to be included.
+        sniff_data - Sniff the start of the payload of 'data:' URIs,
+            see mime_string_from_data_uri.
+
+    Returns:
+        String with a correct mimetype if possible, otherwise None.
+    """
+    uri = fspath(uri)
+    if uri[:5].lower() == "data:":
+        return mime_string_from_data_uri(uri, sniff_data)
+    parts = urlsplit(uri)
+    #single letter schemes are windows drive letters, not schemes
+    path = parts.path if len(parts.scheme) != 1 else uri.split("?", 1)[0].split("#", 1)[0]
+    return cached_mime_string_from_uri_path(path, strict, EXTENSION_TABLES)
+
+"""
+The detection cache consulted by mime_string_from_path, or None if not caching.
+Set using set_detection_cache.
+"""
+DETECTION_CACHE: Any = None
+
+def set_detection_cache(cache:Any):
+    """
+    set_detection_cache
+    Sets the detection cache consulted by mime_string_from_path for local paths.
+
+    Arguments:
+        cache - A SharedDetectionCache, or any object with matching get(key) and put(key, mime)
+            methods taking keys from path_cache_key. None to stop caching.
+    """
+    global DETECTION_CACHE #pylint:disable=global-statement
+    DETECTION_CACHE = cache
 
 XML_DOCTYPE_HEADERS = {
     "<!doctypehtml>": "text/html",
@@ -63,79 +315,470 @@ def mime_string_from_xml_content(content_snippet:str) -> Union[str, None]:
             return v
     return None
 
-def mime_string_from_path(
-                          path:Union[str, PathLike, Path],
-                          strict:bool = False,
-                          *,
-                          no_local_checks:bool = False
-                         ) -> Union[str, None]:
+"""The libmagic handles of each thread, see thread_magic."""
+MAGIC_HANDLES = local()
 
+def thread_magic() -> Any:
     """
-    mime_string_from_path
-    Gets the mime type from the given local path.
+    thread_magic
+    Gets the libmagic handle of the current thread, opening it on first use.
+    Handles are never shared, as libmagic handles are not safe to use from multiple threads
+    (and the 'magic' module otherwise shares one handle behind a lock).
+
+    Returns:
+        The 'magic.Magic' object detecting mime types.
+    """
+    handle = getattr(MAGIC_HANDLES, "handle", None)
+    if handle is None:
+        handle = Magic(mime=True) #type:ignore
+        MAGIC_HANDLES.handle = handle
+    return handle
+
+def puremagic_mime_string_from_path(path:Union[str, PathLike, Path],
+                                    strict:bool = False #pylint:disable=unused-argument
+                                   ) -> Union[str, None]:
+    """
+    puremagic_mime_string_from_path
+    Runs the 'puremagic' module (if imported) on the given path.
+
+    Arguments:
+        path - The local path to the file on the system.
+        strict - Unused, accepted to match the other path detectors.
+
+    Returns:
+        None if the type is not found, or 'puremagic' is not imported,
+        or a string of the mime type.
+    """
+    if not PUREMAGICMIME_AVAILABLE:
+        return None
+    try:
+        guess = puremagic_from_path(path, mime = True).strip() #type: ignore
+    except PureError: #type:ignore
+        return None
+    return guess if guess != "" else None
+
+def magic_mime_string_from_path(path:Union[str, PathLike, Path],
+                                strict:bool = False #pylint:disable=unused-argument
+                               ) -> Union[str, None]:
+    """
+    magic_mime_string_from_path
+    Runs the 'magic' module (if imported) on the given path.
+
+    Arguments:
+        path - The local path to the file on the system.
+        strict - Unused, accepted to match the other path detectors.
+
+    Returns:
+        None if the type is not found, or 'magic' is not imported,
+        or a string of the mime type.
+    """
+    if not MAGICMIME_AVAILABLE:
+        return None
+    guess = thread_magic().from_file(fspath(path)).strip()
+    return guess if guess != "" else None
+
+def extension_mime_string_from_path(path:Union[str, PathLike, Path],
+                                    strict:bool = False
+                                   ) -> Union[str, None]:
+    """
+    extension_mime_string_from_path
+    Guesses the mime type from the extension of the given path (or URI) alone.
+
+    Arguments:
+        path - The path or URI.
+        strict - Allow for non standard types to be included.
+
+    Returns:
+        None if the type is not found, or a string of the mime type.
+    """
+    path = fspath(path)
+    if path[:5].lower() == "data:":
+        guess = split_parameters(mime_string_from_data_uri(path) or "")[0]
+    else:
+        guess = mime_string_from_uri_path(path, strict)
+    guess = guess.strip() if guess is not None else ""
+    return guess if guess != "" else None
+
+class Detector(NamedTuple):
+    """
+    Detector
+
+    A named way of detecting the mime type of a path.
+    """
+
+    """The name of the detector, reported alongside its results."""
+    name: str
+    """The detection function, taking a path and the strict argument."""
+    function: Callable[..., Union[str, None]]
+    """True if the detector needs the path to be available on the local filesystem."""
+    local: bool
+    """
+    True if the detection function also takes a timeout keyword argument (in seconds),
+    killing its work and raising subprocess.TimeoutExpired once overdue.
+    """
+    timed: bool = False
+
+"""The detectors used by mime_string_from_path, in order of priority."""
+PATH_DETECTORS: Tuple[Detector, ...] = (
+    Detector("container", lambda path, strict: mime_string_from_container_path(path), True),
+    Detector("puremagic", puremagic_mime_string_from_path, True),
+    Detector("magic", magic_mime_string_from_path, True),
+    Detector("file",
+             lambda path, strict, timeout=None: file_cmd_mime_type_from_path(path, timeout),
+             True, True),
+    Detector("mimetype",
+             lambda path, strict, timeout=None: mimetype_cmd_mime_type_from_path(path, timeout),
+             True, True),
+    Detector("xdg-mime",
+             lambda path, strict, timeout=None: xdgmime_cmd_mime_type_from_path(path, timeout),
+             True, True),
+    Detector("extension", extension_mime_string_from_path, False),
+)
+
+"""The detector name reported for results found in the detection cache."""
+CACHE_DETECTOR:LiteralString = "cache"
+
+def detection_cache_key(path:Union[str, PathLike, Path],
+                        strict:bool = False,
+                        no_local_checks:bool = False
+                       ) -> Union[int, None]:
+    """
+    detection_cache_key
+    Gets the key of the given path in the detection cache.
+
+    Arguments:
+        path - The path to be checked.
+        strict - Allow for non standard types to be included in some types of checking.
+        no_local_checks - If true, the path is not local and so is never cached.
+
+    Returns:
+        The key, or None if there is no detection cache or the path can not be cached.
+    """
+    if DETECTION_CACHE is None or no_local_checks:
+        return None
+    try:
+        with span("stat", "io", path=path):
+            stat = os_stat(path)
+        return path_cache_key(path, stat, strict)
+    except (OSError, TypeError, ValueError):
+        return None
+
+def cached_mime_string(cache_key:Union[int, None]) -> Union[str, None]:
+    """
+    cached_mime_string
+    Looks up a detection in the detection cache.
+
+    Arguments:
+        cache_key - The key from detection_cache_key, or None if not caching.
+
+    Returns:
+        The cached mime type string, or None on a miss (or if not caching).
+    """
+    cache = DETECTION_CACHE
+    if cache_key is None or cache is None:
+        return None
+    with span("get", "cache") as lookup:
+        cached = cache.get(cache_key)
+        lookup.set(hit=cached is not None)
+    return cached
+
+def cache_mime_string(cache_key:Union[int, None], mime:str):
+    """
+    cache_mime_string
+    Stores a detection in the detection cache.
 
     Arguments:
+        cache_key - The key from detection_cache_key, or None if not caching.
+        mime - The detected mime type string.
+    """
+    cache = DETECTION_CACHE
+    if cache_key is None or cache is None:
+        return
+    with span("put", "cache"):
+        cache.put(cache_key, mime)
+
+def attempt_detector(detector:Detector,
+                     path:Union[str, PathLike, Path],
+                     strict:bool,
+                     **options:Any
+                    ) -> Union[str, None]:
+    """
+    attempt_detector
+    Runs a single path detector.
+
+    Arguments:
+        detector - The detector.
         path - The path to be checked.
         strict - Allow for non standard types to be included in some types of checking.
+        options - Further keyword arguments of the detection function, such as timeout.
+
+    Returns:
+        The mime type string found by the detector, otherwise None.
+    """
+    with span(detector.name, "detector") as attempt:
+        mime = detector.function(path, strict, **options)
+        attempt.set(mime=mime)
+    return mime
+
+"""The most attempts of a single in process detector that may still be running after their race.
+Races report a detector at this limit as timed out without starting it again,
+so that a stalled filesystem can not pile up threads without bound."""
+MAX_STALLED_ATTEMPTS:int = 4
+
+"""The amount of attempts of each in process detector still running after their race."""
+STALLED_ATTEMPTS:Dict[str, int] = {}
+STALLED_ATTEMPTS_LOCK = Lock()
+
+def is_stalled(name:str) -> bool:
+    """
+    is_stalled
+    Checks if a detector has MAX_STALLED_ATTEMPTS attempts still running after their race.
+
+    Arguments:
+        name - The name of the detector.
+
+    Returns:
+        True if the detector should not be started again.
+    """
+    with STALLED_ATTEMPTS_LOCK:
+        return STALLED_ATTEMPTS.get(name, 0) >= MAX_STALLED_ATTEMPTS
+
+def mark_stalled(name:str, future:Future):
+    """
+    mark_stalled
+    Counts an attempt of a detector that is still running after its race, until it finishes.
+
+    Arguments:
+        name - The name of the detector.
+        future - The Future of the attempt, see run_in_thread.
+    """
+    with STALLED_ATTEMPTS_LOCK:
+        STALLED_ATTEMPTS[name] = STALLED_ATTEMPTS.get(name, 0) + 1
+    def finished(_future:Future):
+        with STALLED_ATTEMPTS_LOCK:
+            STALLED_ATTEMPTS[name] -= 1
+    #runs right away if the attempt finished in the meantime
+    future.add_done_callback(finished)
+
+def run_in_thread(function:Callable[..., Any], *args:Any, **kwargs:Any) -> Future:
+    """
+    run_in_thread
+    Runs a function on a new daemon thread of its own.
+    Used for detectors that can not be interrupted, so that a stalled one only ever holds
+    its own thread, rather than taking a worker of a shared pool away from later calls.
+
+    Arguments:
+        function - The function.
+        args - The positional arguments of the function.
+        kwargs - The keyword arguments of the function.
+
+    Returns:
+        A Future of the result of the function.
+    """
+    future:Future = Future()
+    def run():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(function(*args, **kwargs))
+        except BaseException as error: #pylint:disable=broad-exception-caught
+            future.set_exception(error)
+    Thread(target=run, name="mimetypeplus-detector", daemon=True).start()
+    return future
+
+class RaceResult(NamedTuple):
+    """
+    RaceResult
+
+    The result of racing the path detectors against a deadline.
+    """
+
+    """The detected mime type string, or None if no type was detected in time."""
+    mime: Union[str, None]
+    """The name of the detector that found the type, or None if no type was detected in time."""
+    detector: Union[str, None]
+    """The names of the detectors that did not finish before the deadline, in order of priority."""
+    timed_out: Tuple[str, ...]
+
+@traced
+def race_mime_string_from_path(path:Union[str, PathLike, Path],
+                               strict:bool = False,
+                               *,
+                               deadline:float,
+                               no_local_checks:bool = False,
+                               use_cache:bool = True
+                              ) -> RaceResult:
+    """
+    race_mime_string_from_path
+    Gets the mime type from the given local path within a deadline.
+    The in process detectors (which can not be interrupted) all start at once,
+    each on a thread of its own, and the answer of the highest priority one is used.
+    Subprocess based detectors only start once every detector before them came back empty,
+    one after another, and are killed once the deadline passes.
+    In process detectors that are still running at the deadline
+    (such as reads from a stalled network filesystem) are left to finish in the background,
+    and are reported as timed out without being started while MAX_STALLED_ATTEMPTS are.
+    Answers found while a higher priority detector timed out are not cached.
+
+    Arguments:
+        path - The path to be checked.
+        strict - Allow for non standard types to be included in some types of checking.
+        deadline - The latency budget of the detection, in seconds.
         no_local_checks - Skips checks that requires a path to be available on the local filesystem.
             Allows for URIs to be checked safely.
+        use_cache - Consult (and fill) the detection cache, see set_detection_cache.
 
     Returns:
-        String with a correct mimetype if possible, otherwise None.
+        A RaceResult with the type, the detector that found it, and the detectors that timed out.
     """
+    end = monotonic() + deadline
+    cache_key = detection_cache_key(path, strict, no_local_checks) if use_cache else None
+    cached = cached_mime_string(cache_key)
+    if cached is not None:
+        return RaceResult(cached, CACHE_DETECTOR, ())
 
-    mime:str = ""
+    detectors = [detector for detector in PATH_DETECTORS
+                 if not (detector.local and no_local_checks)]
+    attempt = bind(attempt_detector)
+    futures:Dict[str, Future] = {detector.name: run_in_thread(attempt, detector, path, strict)
+                                 for detector in detectors
+                                 if detector.local and not detector.timed
+                                 and not is_stalled(detector.name)}
 
-    if PUREMAGICMIME_AVAILABLE and not no_local_checks:
-        try:
-            mime = puremagic_from_path(path, mime = True).strip() #type: ignore
-        except PureError: #type:ignore
-            pass
+    timed_out:List[str] = []
+    try:
+        for detector in detectors:
+            remaining = end - monotonic()
+            try:
+                if detector.name in futures:
+                    mime = futures[detector.name].result(timeout=max(remaining, 0))
+                elif detector.local and not detector.timed:
+                    #too many earlier attempts of the detector are still stalled
+                    raise FutureTimeoutError()
+                elif detector.timed:
+                    if remaining <= 0:
+                        raise TimeoutExpired(detector.name, deadline)
+                    mime = attempt_detector(detector, path, strict, timeout=remaining)
+                else:
+                    #detectors that do not touch the filesystem can not stall
+                    mime = attempt_detector(detector, path, strict)
+            except (FutureTimeoutError, TimeoutExpired):
+                timed_out.append(detector.name)
+                continue
+            if mime is not None:
+                if len(timed_out) == 0:
+                    cache_mime_string(cache_key, mime)
+                return RaceResult(mime, detector.name, tuple(timed_out))
+        return RaceResult(None, None, tuple(timed_out))
+    finally:
+        #attempts left running (stalled, or no longer needed) are counted until they finish
+        for name, future in futures.items():
+            if not future.done():
+                mark_stalled(name, future)
 
-    if mime == "" and MAGICMIME_AVAILABLE:
-        mime = magic_from_path(path, mime=True).strip() #type:ignore
+@traced
+def mime_string_and_detector_from_path(
+                                       path:Union[str, PathLike, Path],
+                                       strict:bool = False,
+                                       *,
+                                       no_local_checks:bool = False,
+                                       deadline:Union[float, None] = None,
+                                       use_cache:bool = True
+                                      ) -> Tuple[Union[str, None], Union[str, None]]:
 
-    if mime == "" and not no_local_checks:
-        guess = file_cmd_mime_type_from_path(path)
-        mime = guess if guess is not None else ""
+    """
+    mime_string_and_detector_from_path
+    Gets the mime type from the given local path, and the name of the detector that found it.
+
+    Arguments:
+        path - The path to be checked.
+        strict - Allow for non standard types to be included in some types of checking.
+        no_local_checks - Skips checks that requires a path to be available on the local filesystem.
+            Allows for URIs to be checked safely.
+        deadline - The latency budget of the detection in seconds,
+            or None to run the detectors one after another without a limit.
+            See race_mime_string_from_path.
+        use_cache - Consult (and fill) the detection cache, see set_detection_cache.
+            Turn this off when the name of the actual detector matters.
 
-    if mime == "" and not no_local_checks:
-        guess = mimetype_cmd_mime_type_from_path(path)
-        mime = guess if guess is not None else ""
+    Returns:
+        A tuple of the string with a correct mimetype if possible (otherwise None),
+        and the name of the detector (from PATH_DETECTORS, or CACHE_DETECTOR) that found it.
+    """
+
+    if deadline is not None:
+        result = race_mime_string_from_path(path, strict, deadline=deadline,
+                                            no_local_checks=no_local_checks, use_cache=use_cache)
+        return result.mime, result.detector
+
+    cache_key = detection_cache_key(path, strict, no_local_checks) if use_cache else None
+    cached = cached_mime_string(cache_key)
+    if cached is not None:
+        return cached, CACHE_DETECTOR
+
+    for detector in PATH_DETECTORS:
+        if detector.local and no_local_checks:
+            continue
+        mime = attempt_detector(detector, path, strict)
+        if mime is not None:
+            cache_mime_string(cache_key, mime)
+            return mime, detector.name
+
+    return None, None
+
+def mime_string_from_path(
+                          path:Union[str, PathLike, Path],
+                          strict:bool = False,
+                          *,
+                          no_local_checks:bool = False,
+                          deadline:Union[float, None] = None
+                         ) -> Union[str, None]:
 
-    if mime == "" and not no_local_checks:
-        guess = xdgmime_cmd_mime_type_from_path(path)
-        mime = guess if guess is not None else ""
+    """
+    mime_string_from_path
+    Gets the mime type from the given local path.
 
-    if mime == "":
-        guess = guess_type_path_URI(str(path), strict)[0]
-        mime = guess.strip() if guess is not None else ""
+    Arguments:
+        path - The path to be checked.
+        strict - Allow for non standard types to be included in some types of checking.
+        no_local_checks - Skips checks that requires a path to be available on the local filesystem.
+            Allows for URIs to be checked safely.
+        deadline - The latency budget of the detection in seconds,
+            or None to run the detectors one after another without a limit.
 
-    return mime if mime != "" else None
+    Returns:
+        String with a correct mimetype if possible, otherwise None.
+    """
+    return mime_string_and_detector_from_path(path, strict, no_local_checks=no_local_checks,
+                                              deadline=deadline)[0]
 
+@traced
 def mime_string_from_data(
                           buffer:Union[bytes, str],
                           *, hint_path:Union[str, PathLike, None] = None,
                           encoding: str = "utf8",
-                          errors:str = "strict"
+                          errors:str = "strict",
+                          partial:bool = False
                          ) -> Union[None, str]:
 
     """
     mime_string_from_data
     Gets the mime type from the given data.
+    Text types carry a charset parameter, detected from only the start of the content.
 
     Arguments:
         buffer - Either bytes or a string.
         hint_path - A optional path to the data if located on the system.
             Used to make some typechecks more accurate.
         encoding - The presumed encoding of the data if it is a string.
-            This does not have to be accurate in cases where the content is expected
-            to be a binary format, and the content is already bytes.
-            This is used to encode strings, or decode bytes into the oppsite form,
-            allowing for more type checksers to be used.
+            This is used to encode strings into bytes, allowing for more type checksers to be used,
+            and is reported as the charset of text strings.
+            The charset of bytes is detected instead, see charsets.charset_from_data.
         errors - See the encoding argument. Used in the same context,
-            but indicates how to handle encoding/decoding errors.
-            Values match the values used in the str.encode and bytes.decode errors argument.
+            but indicates how to handle encoding errors.
+            Values match the values used in the str.encode errors argument.
+        partial - True if the buffer is only the start of the content,
+            in which case it may end in a cut off character.
 
     Returns:
         String with a correct mimetype if possible, otherwise None.
@@ -153,35 +796,58 @@ def mime_string_from_data(
     except (UnicodeEncodeError, UnicodeError):
         bytes_content = None
 
-    #strictly the buffer converted into a string, if possible
+    #the charset of the buffer and the start of the buffer as a string, if it is text
+    charset:Union[str,None] = None
     str_content:Union[str,None] = None
-    try:
-        if not isinstance(buffer, str):
-            str_content = cast(bytes, buffer).decode(encoding, errors)
-        else:
-            str_content = buffer
-    except (UnicodeDecodeError, UnicodeError):
-        str_content = None
+    if isinstance(buffer, str):
+        try:
+            charset = codecs_lookup(encoding).name
+        except LookupError:
+            charset = encoding.lower()
+        str_content = buffer[:CHARSET_READ_SIZE]
+    else:
+        with span("charset", "detector") as attempt:
+            charset = charset_from_data(buffer, partial = partial)
+            if charset is not None:
+                str_content = decode_head(buffer, charset, partial = partial)
+            attempt.set(charset=charset)
+
+    if mime == "" and bytes_content is not None:
+        with span("container", "detector"):
+            found = mime_string_from_container_data(bytes_content)
+        mime = found if found is not None else ""
 
     if mime == "" and PUREMAGICMIME_AVAILABLE:
         try:
-            mime = puremagic_from_buffer( #type:ignore
-                                         buffer,
-                                         mime = True,
-                                         filename = hint_path
-                                        ).strip()
+            with span("puremagic", "detector"):
+                mime = puremagic_from_buffer( #type:ignore
+                                             buffer,
+                                             mime = True,
+                                             filename = hint_path
+                                            ).strip()
         except PureError: #type:ignore
             pass
 
     if mime == "" and MAGICMIME_AVAILABLE:
-        mime = magic_from_buffer(bytes_content, mime=True).strip() #type:ignore
+        with span("magic", "detector"):
+            mime = thread_magic().from_buffer(bytes_content).strip()
+
+    #the magic modules have weak checks of their own (such as 'BM' for bitmaps) that match text
+    if mime != "" and str_content is not None and not mime_string_fits_text(mime):
+        mime = ""
+
+    if mime == "" and bytes_content is not None:
+        with span("signature", "detector"):
+            found = mime_string_from_signature(bytes_content[:SIGNATURE_READ_SIZE],
+                                               text = str_content is not None)
+        mime = found if found is not None else ""
 
     if mime == "" and hint_path is not None:
         found = mime_string_from_path(hint_path)
         mime = found if found is not None else ""
 
     if mime == "" and str_content is not None:
-        mime = "text/"
+        mime = "text/plain"
 
     mime = mime.strip().lower()
     if str_content is not None and mime.startswith("text/"):
@@ -189,4 +855,266 @@ def mime_string_from_data(
         if xml_check is not None:
             mime = xml_check.strip()
 
-    return mime if mime != "" and mime.count("/") == 1 else None
+    if mime == "" or mime.count("/") != 1:
+        return None
+    if charset is not None and mime.startswith("text/"):
+        mime += join_parameters({"charset": charset})
+    return mime
+
+"""The possible verdicts of a claimed type verification."""
+VERIFY_ACCEPT:LiteralString = "accept"
+VERIFY_REJECT:LiteralString = "reject"
+VERIFY_UNKNOWN:LiteralString = "unknown"
+
+class Verification(NamedTuple):
+    """
+    Verification
+
+    The result of verifying a claimed mime type against some content.
+    """
+
+    """One of VERIFY_ACCEPT, VERIFY_REJECT or VERIFY_UNKNOWN."""
+    verdict: str
+    """A human readable reason for the verdict."""
+    reason: str
+    """The mime type the content was found to be, if it was determined."""
+    detected: Union[str, None] = None
+
+@traced
+def verify_mime_string(source:Union[bytes, bytearray, memoryview, str, PathLike, Path, Any],
+                       claimed:str
+                      ) -> Verification:
+    """
+    verify_mime_string
+    Verifies that the given content really is of the claimed mime type.
+    Content matching a signature of the claimed type itself is accepted
+    after reading only the first SIGNATURE_READ_SIZE bytes.
+    Otherwise the type is detected from the content alone (never from the extension of a path),
+    and the content is only accepted if it is the claimed type or a more specific kind of it.
+    The members of zip based containers are checked, so a plain zip archive is not accepted
+    as any of the formats built on top of zip.
+
+    Arguments:
+        source - Either bytes of the content, a local path to it,
+            or a binary file like object positioned at the start of the content.
+            File like objects are returned to their original position if they are seekable.
+        claimed - The mime type string the content claims to be. Any parameters are ignored.
+
+    Returns:
+        A Verification with the verdict, a reason, and the detected type if it was determined.
+    """
+    lineage = mime_string_lineage(claimed)
+    if len(lineage) == 0 or lineage[0] == "":
+        return Verification(VERIFY_UNKNOWN, "no claimed type was given")
+    if not any(mime in MAGIC_SIGNATURES for mime in lineage):
+        return Verification(VERIFY_UNKNOWN, f"no signature is known for {lineage[0]}")
+
+    head = read_head(source, SIGNATURE_READ_SIZE)
+    is_text = charset_from_data(head, partial = len(head) == SIGNATURE_READ_SIZE) is not None
+    found = mime_string_from_signature(head, is_text)
+    #the signature of a parent type (such as zip) only narrows the content down
+    if found is not None and lineage[0] in mime_string_lineage(found):
+        return Verification(VERIFY_ACCEPT, f"matched the signature of {found}", found)
+
+    #whether the detection saw the whole content, or at least the whole zip central directory
+    complete = True
+    detected:Union[str, None]
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        detected = mime_string_from_data(bytes(source))
+    elif isinstance(source, (str, PathLike, Path)):
+        with open(source, "rb") as f:
+            detected = mime_string_from_stream(f)
+    elif source.seekable():
+        detected = mime_string_from_stream(source)
+    else:
+        #the head was already consumed, so it goes back in front of the rest of the content
+        content = head + source.read(STREAM_READ_SIZE - len(head))
+        complete = len(content) < STREAM_READ_SIZE
+        detected = mime_string_from_data(content, partial = not complete)
+
+    if detected is None:
+        return Verification(VERIFY_UNKNOWN, "no type was detected from the content")
+    detected_lineage = mime_string_lineage(detected)
+    if lineage[0] in detected_lineage:
+        return Verification(VERIFY_ACCEPT, f"detected {detected}", detected)
+    if detected_lineage[0] in lineage and not (complete and ZIP_MIME_STRING in lineage):
+        return Verification(VERIFY_UNKNOWN,
+                            f"only detected {detected}, a parent type of {lineage[0]}",
+                            detected
+                           )
+    return Verification(VERIFY_REJECT, f"detected {detected}", detected)
+
+def read_head(source:Union[bytes, bytearray, memoryview, str, PathLike, Path, Any],
+              size:int
+             ) -> bytes:
+    """
+    read_head
+    Reads the first bytes of the given content.
+
+    Arguments:
+        source - Either bytes of the content, a local path to it,
+            or a binary file like object positioned at the start of the content.
+            File like objects are returned to their original position if they are seekable.
+        size - The maximum amount of bytes to read, or -1 to read everything.
+
+    Returns:
+        The read bytes.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source[:size] if size >= 0 else source)
+    with span("read", "io") as read:
+        if isinstance(source, (str, PathLike, Path)):
+            with open(source, "rb") as f:
+                head = f.read(size)
+        else:
+            position = source.tell() if source.seekable() else None
+            head = source.read(size)
+            if position is not None:
+                source.seek(position)
+        read.set(bytes=len(head))
+    return head
+
+"""The amount of bytes read from the start of a stream for detection."""
+STREAM_READ_SIZE:int = 64 * 1024
+
+@traced
+def mime_string_from_stream(stream:Any,
+                            *,
+                            hint_path:Union[str, PathLike, None] = None
+                           ) -> Union[str, None]:
+    """
+    mime_string_from_stream
+    Gets the mime type from the content of the given stream,
+    reading at most STREAM_READ_SIZE bytes from it
+    (or only the central directory of seekable zip archives).
+
+    Arguments:
+        stream - A binary file like object positioned at the start of the content.
+            It is returned to its original position if it is seekable.
+        hint_path - A optional path to the data if located on the system.
+            Used to make some typechecks more accurate.
+
+    Returns:
+        String with a correct mimetype if possible, otherwise None.
+    """
+    head = read_head(stream, STREAM_READ_SIZE)
+    if stream.seekable() and is_zip_head(head):
+        position = stream.tell()
+        found = mime_string_from_zip_stream(stream)
+        stream.seek(position)
+        if found is not None:
+            return found
+    return mime_string_from_data(head,
+                                 hint_path = hint_path,
+                                 partial = len(head) == STREAM_READ_SIZE
+                                )
+
+@traced
+def mime_string_and_encoding_from_stream(stream:Any,
+                                         *,
+                                         hint_path:Union[str, PathLike, None] = None
+                                        ) -> Tuple[Union[str, None], Union[str, None]]:
+    """
+    mime_string_and_encoding_from_stream
+    Gets the mime type of the content of the given stream,
+    looking through gzip, bzip2 and xz compression.
+    Only the beginning of compressed content is decompressed,
+    up to MAX_DECOMPRESSED_SIZE bytes.
+
+    Arguments:
+        stream - A binary file like object positioned at the start of the content.
+            It is returned to its original position if it is seekable.
+        hint_path - A optional path to the data if located on the system.
+            Its extensions are used if the decompressed content alone is not conclusive.
+
+    Returns:
+        A tuple of the mime type string of the (decompressed) content, and the name of
+        the compression encoding ('gzip', 'bzip2' or 'xz') or None if it was not compressed;
+        matching the form of mimetypes.guess_type.
+    """
+    position = stream.tell() if stream.seekable() else None
+    with span("read", "io") as head_read:
+        head = stream.read(STREAM_READ_SIZE)
+        head_read.set(bytes=len(head))
+    compression_format = compression_format_from_head(head)
+    if compression_format is None:
+        if position is None:
+            return mime_string_from_data(head,
+                                         hint_path = hint_path,
+                                         partial = len(head) == STREAM_READ_SIZE
+                                        ), None
+        stream.seek(position)
+        return mime_string_from_stream(stream, hint_path=hint_path), None
+
+    #the already read head is decompressed first, before reading any more of the stream
+    pending = [head]
+    def read(size:int) -> bytes:
+        if len(pending) > 0:
+            return pending.pop()
+        with span("read", "io") as traced_read:
+            data = stream.read(size)
+            traced_read.set(bytes=len(data))
+        return data
+    inner = decompress_head(read, compression_format)
+    if position is not None:
+        stream.seek(position)
+
+    encoding = COMPRESSION_FORMATS[compression_format][0]
+    mime:Union[str, None] = None
+    if len(inner) > 0:
+        mime = mime_string_from_data(inner, partial = len(inner) == MAX_DECOMPRESSED_SIZE)
+    base, parameters = split_parameters(mime if mime is not None else "")
+    if base in ("", "text/plain", ROOT_MIME_STRING) and hint_path is not None:
+        guess, guess_encoding = mime_string_and_encoding_from_uri_path(fspath(hint_path), True)
+        if guess is not None and guess_encoding == encoding:
+            mime = guess
+            if guess.startswith("text/"):
+                mime += join_parameters(parameters)
+    return mime, encoding
+
+def mime_string_and_encoding_from_data(buffer:bytes,
+                                       *,
+                                       hint_path:Union[str, PathLike, None] = None
+                                      ) -> Tuple[Union[str, None], Union[str, None]]:
+    """
+    mime_string_and_encoding_from_data
+    Gets the mime type of the given data, looking through gzip, bzip2 and xz compression.
+    See mime_string_and_encoding_from_stream.
+
+    Arguments:
+        buffer - The content as bytes.
+        hint_path - A optional path to the data if located on the system.
+
+    Returns:
+        A tuple of the mime type string of the (decompressed) content,
+        and the name of the compression encoding or None if it was not compressed.
+    """
+    if compression_format_from_head(buffer[:SIGNATURE_READ_SIZE]) is None:
+        return mime_string_from_data(buffer, hint_path=hint_path), None
+    return mime_string_and_encoding_from_stream(BytesIO(buffer), hint_path=hint_path)
+
+def mime_string_and_encoding_from_path(path:Union[str, PathLike, Path],
+                                       strict:bool = False
+                                      ) -> Tuple[Union[str, None], Union[str, None]]:
+    """
+    mime_string_and_encoding_from_path
+    Gets the mime type of the file at the given local path,
+    looking through gzip, bzip2 and xz compression.
+    See mime_string_and_encoding_from_stream.
+
+    Arguments:
+        path - The path to be checked.
+        strict - Allow for non standard types to be included in some types of checking.
+
+    Returns:
+        A tuple of the mime type string of the (decompressed) content,
+        and the name of the compression encoding or None if it was not compressed.
+    """
+    with open(path, "rb") as f:
+        with span("read", "io") as read:
+            head = f.read(SIGNATURE_READ_SIZE)
+            read.set(bytes=len(head))
+        if compression_format_from_head(head) is not None:
+            f.seek(0)
+            return mime_string_and_encoding_from_stream(f, hint_path=path)
+    return mime_string_from_path(path, strict), None
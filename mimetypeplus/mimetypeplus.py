@@ -25,7 +25,8 @@ class MimeType():
 
     # this is meant to be called when the class is defined,
     # hence it's uncommon placement
-    mimetypes_init()
+    if not mimetypes_module.inited:
+        mimetypes_init()
 
     DEFAULT_TEXT_EXTENTION:LiteralString = "txt"
     DEFAULT_BINARY_EXTENTION:LiteralString = "bin"
@@ -56,7 +57,11 @@ class MimeType():
         return MimeType(string) if string is not None else None
 
     @staticmethod
-    def from_path(path:Union[str, PathLike], strict:bool = False) -> Union['MimeType', None]:
+    def from_path(path:Union[str, PathLike],
+                  strict:bool = False,
+                  *,
+                  deadline:Union[float, None] = None
+                 ) -> Union['MimeType', None]:
         """
         from_path
         Creates a MimeType object from the given local path.
@@ -64,26 +69,31 @@ class MimeType():
         Arguments:
             path - The path to be checked.
             strict - Allow for non standard types to be included in some types of checking.
+            deadline - The latency budget of the detection in seconds, racing the detectors
+                concurrently and using the best answer found in time.
+                None to run the detectors one after another without a limit.
 
         Returns:
             MimeType object with a correct mimetype if possible, otherwise None.
         """
-        string = mime_string_from_path(path, strict=strict)
+        string = mime_string_from_path(path, strict=strict, deadline=deadline)
         return MimeType(string) if string is not None else None
 
     @staticmethod
     def from_uri(uri:str, strict:bool = False) -> Union['MimeType', None]:
         """
         from_uri
-        Creates a MimeType object from the given uri.
+        Creates a MimeType object from the given uri, without touching the local filesystem.
+        The query and fragment are ignored, and 'data:' URIs are answered from their header.
 
         Arguments:
             uri - The uri to be checked.
+            strict - Allow for non standard types to be included.
 
         Returns:
             MimeType object with a correct mimetype if possible, otherwise None.
         """
-        string = mime_string_from_path(uri, strict=strict, no_local_checks=True)
+        string = mime_string_from_uri(uri, strict=strict)
         return MimeType(string) if string is not None else None
     from_url = from_uri
 
@@ -121,28 +131,149 @@ class MimeType():
                                       )
         return MimeType(string) if string is not None else None
 
+    @staticmethod
+    def from_stream(stream:Any,
+                    *,
+                    hint_path:Union[str, PathLike, None] = None
+                   ) -> Union['MimeType', None]:
+        """
+        from_stream
+        Creates a MimeType object from the content of the given stream,
+        reading only the beginning of it.
+
+        Arguments:
+            stream - A binary file like object positioned at the start of the content.
+                It is returned to its original position if it is seekable.
+            hint_path - A optional path to the data if located on the system.
+                Used to make some typechecks more accurate.
+
+        Returns:
+            MimeType object with a correct mimetype if possible, otherwise None.
+        """
+        string = mime_string_from_stream(stream, hint_path = hint_path)
+        return MimeType(string) if string is not None else None
+
+    @staticmethod
+    def from_compressed_path(path:Union[str, PathLike],
+                             strict:bool = False
+                            ) -> Tuple[Union['MimeType', None], Union[str, None]]:
+        """
+        from_compressed_path
+        Creates a MimeType object of the content of the file at the given local path,
+        looking through gzip, bzip2 and xz compression.
+        Only the first few KB of compressed content are ever decompressed.
+
+        Arguments:
+            path - The path to be checked.
+            strict - Allow for non standard types to be included in some types of checking.
+
+        Returns:
+            A tuple of the MimeType object of the (decompressed) content
+            if possible (otherwise None),
+            and the name of the compression encoding ('gzip', 'bzip2' or 'xz')
+            or None if it was not compressed.
+        """
+        string, encoding = mime_string_and_encoding_from_path(path, strict)
+        return (MimeType(string) if string is not None else None), encoding
+
+    @staticmethod
+    def from_compressed_data(buffer:bytes,
+                             *,
+                             hint_path:Union[str, PathLike, None] = None
+                            ) -> Tuple[Union['MimeType', None], Union[str, None]]:
+        """
+        from_compressed_data
+        Creates a MimeType object of the given data,
+        looking through gzip, bzip2 and xz compression.
+        Only the first few KB of compressed content are ever decompressed.
+
+        Arguments:
+            buffer - The content as bytes.
+            hint_path - A optional path to the data if located on the system.
+
+        Returns:
+            A tuple of the MimeType object of the (decompressed) content
+            if possible (otherwise None),
+            and the name of the compression encoding or None if it was not compressed.
+        """
+        string, encoding = mime_string_and_encoding_from_data(buffer, hint_path = hint_path)
+        return (MimeType(string) if string is not None else None), encoding
+
+    @staticmethod
+    def from_compressed_stream(stream:Any,
+                               *,
+                               hint_path:Union[str, PathLike, None] = None
+                              ) -> Tuple[Union['MimeType', None], Union[str, None]]:
+        """
+        from_compressed_stream
+        Creates a MimeType object of the content of the given stream,
+        looking through gzip, bzip2 and xz compression.
+        Only the first few KB of compressed content are ever decompressed.
+
+        Arguments:
+            stream - A binary file like object positioned at the start of the content.
+                It is returned to its original position if it is seekable.
+            hint_path - A optional path to the data if located on the system.
+
+        Returns:
+            A tuple of the MimeType object of the (decompressed) content
+            if possible (otherwise None),
+            and the name of the compression encoding or None if it was not compressed.
+        """
+        string, encoding = mime_string_and_encoding_from_stream(stream, hint_path = hint_path)
+        return (MimeType(string) if string is not None else None), encoding
+
+    @staticmethod
+    def verify(source:Union[bytes, bytearray, memoryview, str, PathLike, Any],
+               claimed:Union['MimeType', str]
+              ) -> Verification:
+        """
+        verify
+        Verifies that the given content really is of the claimed mime type.
+        This is much cheaper than full identification when the claim is correct,
+        as only the first bytes are checked against the signature of the claimed type.
+        Full detection from the content alone is only run if the claim could not be confirmed
+        this way, such as for formats sharing the signature of a parent type (like zip).
+
+        Arguments:
+            source - Either bytes of the content, a local path to it,
+                or a binary file like object positioned at the start of the content.
+            claimed - The mime type the content claims to be.
+
+        Returns:
+            A Verification, with the verdict (VERIFY_ACCEPT, VERIFY_REJECT or VERIFY_UNKNOWN),
+            a reason for it, and the detected type string if it was determined.
+        """
+        return verify_mime_string(source, str(claimed))
+
     def __init__(self,
                  mime:Union['MimeType', str, Tuple[str, str], Iterable[str]] = "",
                  *,
                  maintype: str = "",
                  subtype: str = "",
+                 parameters: Union[Dict[str, str], None] = None,
                 ):
         """
         __init__ Creates a MimeType object.
 
         Keyword Arguments:
             mime -- The object to base the mime type off of.
-                Accepts full strings, 2 string tuples,
-                iterables (expected to return only 2 strings), or another MimeType object.
+                Accepts full strings (optionally with parameters, such as '; charset=utf-8'),
+                2 string tuples, iterables (expected to return only 2 strings),
+                or another MimeType object.
             maintype -- Used to override the maintype, if not an empty string.
             subtype -- Used to override the subtype, if not an empty string.
+            parameters -- Used to add to or override the parameters, if not None.
         """
         self.__maintype: str = MimeType.WILDCARD_SEQUENCE
         self.__subtype: str = MimeType.WILDCARD_SEQUENCE
+        self.__parameters: Dict[str, str] = {}
 
         if isinstance(mime, MimeType):
+            self.parameters = mime.parameters
             mime = tuple(mime)
         elif isinstance(mime, str):
+            mime, self.parameters = split_parameters(mime)
             mime = tuple(mime.split("/"))
         elif isinstance(mime, Iterable):
             mime = tuple(x.strip("/") for x in mime)
@@ -157,6 +288,8 @@ class MimeType():
             self.maintype = maintype
         if subtype != "":
             self.subtype = subtype
+        if parameters is not None:
+            self.parameters = {**self.parameters, **parameters}
 
     @property
     def maintype(self) -> str:
@@ -186,6 +319,37 @@ class MimeType():
             value = MimeType.WILDCARD_SEQUENCE
         self.__subtype = value
 
+    @property
+    def parameters(self) -> Dict[str, str]:
+        """
+        parameters
+        The parameters of the mimetype (such as 'charset'), by their lowercase names.
+        Changes to the returned dictionary do not affect the mimetype, set this property instead.
+        """
+        return dict(self.__parameters)
+    @parameters.setter
+    def parameters(self, value: Dict[str, str]):
+        parameters = {name.strip().lower(): value.strip() for name, value in value.items()}
+        if "charset" in parameters:
+            parameters["charset"] = parameters["charset"].lower()
+        self.__parameters = parameters
+
+    @property
+    def charset(self) -> str:
+        """
+        charset
+        The 'charset' parameter of the mimetype, if any.
+        A blank string if not set.
+        """
+        return self.__parameters.get("charset", "")
+    @charset.setter
+    def charset(self, value: str):
+        value = value.strip().lower()
+        if value == "":
+            self.__parameters.pop("charset", None)
+        else:
+            self.__parameters["charset"] = value
+
     @property
     def suffix(self) -> str:
         """
@@ -254,9 +418,9 @@ class MimeType():
         encode
         
         Returns:
-            The MimeType object as a string.
+            The MimeType object as a string, including any parameters.
         """
-        return f"{self.maintype}/{self.subtype}"
+        return f"{self.maintype}/{self.subtype}{join_parameters(self.__parameters)}"
     __str__ = encode
     __repr__ = encode
 
@@ -313,15 +477,10 @@ class MimeType():
             otherwise None.
         """
         if not self.is_empty():
-            ext = guess_extension_text(
-                                       str(self).replace(MimeType.WILDCARD_SEQUENCE, ""),
-                                       strict=strict
-                                      )
-            if ext is not None:
-                ext = ext.lstrip(".")
-            elif self.maintype == "text":
+            ext = extension_from_mime_string(f"{self.maintype}/{self.subtype}", strict)
+            if ext is None and self.maintype == "text":
                 ext = MimeType.DEFAULT_TEXT_EXTENTION
-            elif self.maintype != MimeType.WILDCARD_SEQUENCE:
+            elif ext is None and self.maintype != MimeType.WILDCARD_SEQUENCE:
                 ext = MimeType.DEFAULT_BINARY_EXTENTION
             return ext
         else:
@@ -0,0 +1,430 @@
+"""
+shmcache
+
+A detection cache shared between processes (such as the workers of a web server),
+built on a fixed size open addressing table in shared memory.
+Reads are lock free, using seqlock style versioning and a checksum per slot,
+so a torn or concurrently written slot is only ever treated as a miss.
+Mime type strings are interned into a second table, and stored in slots as their ids.
+Interning a new type is the only write that takes a lock, a file lock shared by all processes.
+"""
+
+#pylint:disable=wildcard-import,unused-wildcard-import,pointless-string-statement
+
+import sys
+from hashlib import blake2b
+from os import path as os_path, remove, stat_result
+from struct import Struct
+from tempfile import gettempdir
+from time import monotonic, sleep
+
+from .typings import *
+
+"""True if the 'multiprocessing.shared_memory' module was imported (python 3.8 and above)."""
+SHARED_MEMORY_AVAILABLE: bool  # DO NOT MODIFY, READ ONLY
+try:
+    from multiprocessing import shared_memory, resource_tracker
+    SHARED_MEMORY_AVAILABLE = True
+except ImportError:
+    SHARED_MEMORY_AVAILABLE = False
+
+#file locks are taken with 'msvcrt' on windows, and with 'fcntl' everywhere else
+if sys.platform == "win32":
+    import msvcrt #pylint:disable=import-error
+else:
+    import fcntl
+
+"""Identifies shared memory laid out as a detection cache, followed by the layout version."""
+CACHE_MAGIC:bytes = b"MTPC"
+CACHE_VERSION:int = 1
+
+"""The header of the shared memory: magic, version, slot count, type slot count."""
+HEADER = Struct("<4sIII")
+"""The sequence number at the start of every slot, odd while the slot is being written."""
+SEQUENCE = Struct("<I")
+"""A cache slot: sequence number, type id, key, checksum."""
+SLOT = Struct("<IIQQ")
+"""The header of a type slot: sequence number, string length, string hash."""
+TYPE_SLOT = Struct("<IIQ")
+"""The size of a type slot, including its header."""
+TYPE_SLOT_SIZE:int = 128
+"""The longest mime type string that can be cached, in bytes."""
+MAX_TYPE_LENGTH:int = TYPE_SLOT_SIZE - TYPE_SLOT.size
+
+"""The longest time (in seconds) attaching waits for the creator to write the header."""
+ATTACH_TIMEOUT:float = 1.0
+
+"""
+The amount of slots probed for a key.
+Once these are all used, one of them is evicted, bounding the cost of every lookup.
+"""
+PROBE_LIMIT:int = 8
+
+MASK_64:int = 0xFFFFFFFFFFFFFFFF
+
+def hash64(data:bytes) -> int:
+    """
+    hash64
+    Gets a 64 bit hash of the given data that is stable across processes
+    (unlike the builtin hash function, which is salted per process).
+
+    Arguments:
+        data - The data to hash.
+
+    Returns:
+        A non zero 64 bit integer.
+    """
+    return int.from_bytes(blake2b(data, digest_size=8).digest(), "little") or 1
+
+def path_cache_key(path:Union[str, PathLike, Path], stat:stat_result, strict:bool = False) -> int:
+    """
+    path_cache_key
+    Gets the cache key of a detection of the file at the given path.
+    The key changes whenever the file is replaced or modified.
+
+    Arguments:
+        path - The local path to the file.
+        stat - The result of os.stat on the path.
+        strict - The strict argument the detection was done with.
+
+    Returns:
+        A non zero 64 bit integer.
+    """
+    key = (f"{path}\0{int(strict)}\0{stat.st_dev}\0{stat.st_ino}\0{stat.st_size}"
+           f"\0{stat.st_mtime_ns}\0{stat.st_ctime_ns}")
+    return hash64(key.encode("utf8", "surrogateescape"))
+
+def slot_checksum(key:int, type_id:int) -> int:
+    """
+    slot_checksum
+    Gets the checksum stored alongside a key and type id, detecting torn writes.
+
+    Arguments:
+        key - The key of the slot.
+        type_id - The type id of the slot.
+
+    Returns:
+        A 64 bit integer.
+    """
+    return ((key ^ 0x5BD1E9955BD1E995) * 0x9E3779B97F4A7C15 + type_id) & MASK_64
+
+def lock_file(f:Any):
+    """
+    lock_file
+    Takes an exclusive lock on the given open file, waiting until it is available.
+
+    Arguments:
+        f - The open file.
+    """
+    if sys.platform == "win32":
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+    else:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+def unlock_file(f:Any):
+    """
+    unlock_file
+    Releases the lock taken by lock_file.
+
+    Arguments:
+        f - The open file.
+    """
+    if sys.platform == "win32":
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+class SharedDetectionCache():
+    """
+    SharedDetectionCache
+
+    A cache of detected mime types keyed on a hash of the path and stat of a file,
+    stored in shared memory so that all processes using the same name share it.
+    Install it using mimetypecheckers.set_detection_cache to have detection from paths use it.
+    No process tracks the block, so it outlives every process using it (including its creator),
+    until unlink is called once it is no longer needed.
+    """
+
+    def __init__(self,
+                 name:Union[str, None] = None,
+                 *,
+                 slots:int = 1 << 16,
+                 type_slots:int = 1 << 10,
+                 create:Union[bool, None] = None
+                ):
+        """
+        __init__ Creates or attaches to a shared detection cache.
+
+        Keyword Arguments:
+            name -- The name of the shared memory block, or None to create one with a unique name.
+            slots -- The amount of detections the cache can hold, used only when creating it.
+            type_slots -- The amount of distinct mime types the cache can hold,
+                used only when creating it.
+            create -- True to always create a new block, False to only attach to an existing one,
+                or None to attach if a block with the name exists and create it otherwise.
+        """
+        if not SHARED_MEMORY_AVAILABLE:
+            raise RuntimeError("multiprocessing.shared_memory is not available")
+
+        size = HEADER.size + slots * SLOT.size + type_slots * TYPE_SLOT_SIZE
+        self.__shm:Any = None
+        while self.__shm is None:
+            if create is not True and name is not None:
+                try:
+                    self.__shm = SharedDetectionCache.attach(name)
+                    break
+                except FileNotFoundError:
+                    if create is False:
+                        raise
+            try:
+                self.__shm = SharedDetectionCache.create_block(name, size)
+                HEADER.pack_into(self.__shm.buf, 0, CACHE_MAGIC, CACHE_VERSION, slots, type_slots)
+            except FileExistsError:
+                #another process created it in the meantime, so attach to theirs instead
+                if create is True:
+                    raise
+
+        magic, version, self.__slots, self.__type_slots = HEADER.unpack_from(self.__shm.buf, 0)
+        if magic != CACHE_MAGIC or version != CACHE_VERSION:
+            self.__shm.close()
+            raise ValueError(f"shared memory '{self.__shm.name}' is not a detection cache")
+        self.__types_offset:int = HEADER.size + self.__slots * SLOT.size
+        self.__type_ids:Dict[str, int] = {}
+        self.__type_strings:Dict[int, str] = {}
+        self.__lock_path = os_path.join(gettempdir(), f"{self.name.lstrip('/')}.mimetypeplus.lock")
+
+    @staticmethod
+    def untrack(shm:Any):
+        """
+        untrack
+        Stops the resource tracker of this process from removing the block once the process exits.
+        Only needed on python versions before 3.13, which always track shared memory.
+
+        Arguments:
+            shm - The SharedMemory object.
+        """
+        name = shm._name #pylint:disable=protected-access
+        resource_tracker.unregister(name, "shared_memory") #type:ignore
+
+    @staticmethod
+    def create_block(name:Union[str, None], size:int) -> Any:
+        """
+        create_block
+        Creates a new shared memory block without tracking it,
+        so that it is not removed when the creating process exits.
+
+        Arguments:
+            name - The name of the shared memory block, or None for a unique name.
+            size - The size of the block in bytes.
+
+        Returns:
+            The SharedMemory object.
+        """
+        #python versions before 3.13 always track shared memory, so stop tracking manually
+        if sys.version_info >= (3, 13):
+            #pylint:disable-next=unexpected-keyword-arg
+            shm = shared_memory.SharedMemory(name, create=True, size=size, track=False) #type:ignore
+            return shm
+        shm = shared_memory.SharedMemory(name, create=True, size=size) #type:ignore
+        SharedDetectionCache.untrack(shm)
+        return shm
+
+    @staticmethod
+    def attach(name:str) -> Any:
+        """
+        attach
+        Attaches to an existing shared memory block without tracking it,
+        so that it is not removed when the attaching process exits.
+        Waits (up to ATTACH_TIMEOUT) for a concurrent creator to finish writing the header.
+
+        Arguments:
+            name - The name of the shared memory block.
+
+        Returns:
+            The SharedMemory object.
+        """
+        if sys.version_info >= (3, 13):
+            #pylint:disable-next=unexpected-keyword-arg
+            shm = shared_memory.SharedMemory(name, track=False) #type:ignore
+        else:
+            shm = shared_memory.SharedMemory(name) #type:ignore
+            SharedDetectionCache.untrack(shm)
+        buf = cast(memoryview, shm.buf)
+        deadline = monotonic() + ATTACH_TIMEOUT
+        unwritten = bytes(len(CACHE_MAGIC))
+        while bytes(buf[:len(CACHE_MAGIC)]) == unwritten and monotonic() < deadline:
+            sleep(0.001)
+        return shm
+
+    @property
+    def name(self) -> str:
+        """
+        name
+        The name of the shared memory block, used to attach to it from other processes.
+        """
+        return self.__shm.name
+
+    def close(self):
+        """
+        close
+        Detaches this process from the cache. The cache remains for other processes.
+        """
+        self.__shm.close()
+
+    def unlink(self):
+        """
+        unlink
+        Removes the shared memory block, once all processes have closed it.
+        """
+        if sys.version_info < (3, 13):
+            #python versions before 3.13 stop tracking when unlinking, so track it again first
+            name = self.__shm._name #pylint:disable=protected-access
+            resource_tracker.register(name, "shared_memory") #type:ignore
+        self.__shm.unlink()
+        try:
+            remove(self.__lock_path)
+        except OSError:
+            pass
+
+    def get(self, key:int) -> Union[str, None]:
+        """
+        get
+        Looks up a cached mime type without taking any locks.
+
+        Arguments:
+            key - The key, usually from path_cache_key.
+
+        Returns:
+            The cached mime type string, or None on a miss.
+        """
+        buf = self.__shm.buf
+        start = key % self.__slots
+        for probe in range(PROBE_LIMIT):
+            offset = HEADER.size + ((start + probe) % self.__slots) * SLOT.size
+            sequence, type_id, slot_key, checksum = SLOT.unpack_from(buf, offset)
+            if slot_key == 0:
+                return None
+            if slot_key != key:
+                continue
+            if (sequence & 1 or SEQUENCE.unpack_from(buf, offset)[0] != sequence
+                or checksum != slot_checksum(slot_key, type_id)):
+                return None
+            return self.type_string(type_id)
+        return None
+
+    def put(self, key:int, mime:str):
+        """
+        put
+        Stores a mime type in the cache, evicting an older entry if all probed slots are used.
+        Types that do not fit in the type table are not cached.
+
+        Arguments:
+            key - The key, usually from path_cache_key.
+            mime - The mime type string.
+        """
+        type_id = self.type_id(mime)
+        if type_id is None:
+            return
+        buf = self.__shm.buf
+        start = key % self.__slots
+        target = None
+        for probe in range(PROBE_LIMIT):
+            index = (start + probe) % self.__slots
+            slot_key = SLOT.unpack_from(buf, HEADER.size + index * SLOT.size)[2]
+            if slot_key in (0, key):
+                target = index
+                break
+        if target is None:
+            target = (start + (key >> 32) % PROBE_LIMIT) % self.__slots
+
+        offset = HEADER.size + target * SLOT.size
+        sequence = SEQUENCE.unpack_from(buf, offset)[0] | 1
+        SEQUENCE.pack_into(buf, offset, sequence)
+        SLOT.pack_into(buf, offset, sequence, type_id, key, slot_checksum(key, type_id))
+        SEQUENCE.pack_into(buf, offset, (sequence + 1) & 0xFFFFFFFF)
+
+    def read_type_slot(self, type_id:int) -> Union[str, None]:
+        """
+        read_type_slot
+        Reads and verifies the mime type string in a type slot.
+
+        Arguments:
+            type_id - The id of the type slot.
+
+        Returns:
+            The mime type string, or None if the slot is empty or not consistent.
+        """
+        if not 0 < type_id <= self.__type_slots:
+            return None
+        buf = self.__shm.buf
+        offset = self.__types_offset + (type_id - 1) * TYPE_SLOT_SIZE
+        sequence, length, string_hash = TYPE_SLOT.unpack_from(buf, offset)
+        if sequence & 1 or length == 0 or length > MAX_TYPE_LENGTH:
+            return None
+        data = bytes(buf[offset + TYPE_SLOT.size:offset + TYPE_SLOT.size + length])
+        if SEQUENCE.unpack_from(buf, offset)[0] != sequence or hash64(data) != string_hash:
+            return None
+        return data.decode("utf8", "replace")
+
+    def type_string(self, type_id:int) -> Union[str, None]:
+        """
+        type_string
+        Gets the mime type string of an interned type id.
+
+        Arguments:
+            type_id - The type id.
+
+        Returns:
+            The mime type string, or None if the id is not (consistently) interned.
+        """
+        if type_id in self.__type_strings:
+            return self.__type_strings[type_id]
+        string = self.read_type_slot(type_id)
+        if string is not None:
+            self.__type_strings[type_id] = string
+            self.__type_ids[string] = type_id
+        return string
+
+    def type_id(self, mime:str) -> Union[int, None]:
+        """
+        type_id
+        Interns a mime type string into the shared type table.
+        Types not yet known to this process are looked up (and written) under the file lock,
+        so that two processes never claim the same empty slot.
+
+        Arguments:
+            mime - The mime type string.
+
+        Returns:
+            The id of the type, or None if it is too long or the type table is full.
+        """
+        if mime in self.__type_ids:
+            return self.__type_ids[mime]
+        data = mime.encode("utf8")
+        if len(data) == 0 or len(data) > MAX_TYPE_LENGTH:
+            return None
+        string_hash = hash64(data)
+        buf = self.__shm.buf
+        with open(self.__lock_path, "ab") as lock:
+            lock_file(lock)
+            try:
+                for probe in range(self.__type_slots):
+                    type_id = (string_hash + probe) % self.__type_slots + 1
+                    offset = self.__types_offset + (type_id - 1) * TYPE_SLOT_SIZE
+                    sequence, length, _ = TYPE_SLOT.unpack_from(buf, offset)
+                    if length != 0 or sequence & 1:
+                        if self.type_string(type_id) == mime:
+                            return type_id
+                        continue
+                    SEQUENCE.pack_into(buf, offset, sequence | 1)
+                    buf[offset + TYPE_SLOT.size:offset + TYPE_SLOT.size + len(data)] = data
+                    TYPE_SLOT.pack_into(buf, offset, sequence | 1, len(data), string_hash)
+                    SEQUENCE.pack_into(buf, offset, ((sequence | 1) + 1) & 0xFFFFFFFF)
+                    self.__type_strings[type_id] = mime
+                    self.__type_ids[mime] = type_id
+                    return type_id
+            finally:
+                unlock_file(lock)
+        return None
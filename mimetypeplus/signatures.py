@@ -0,0 +1,212 @@
+"""
+signatures
+
+Known magic byte signatures of common mime types, and the hierarchy between mime types.
+Used for cheap checks that only need the first few bytes of content.
+"""
+
+#pylint:disable=wildcard-import,unused-wildcard-import,pointless-string-statement
+
+from .typings import *
+
+"""
+The known magic byte signatures of common mime types.
+Each mime type maps to a tuple of alternative signatures,
+and each signature is a tuple of (offset, bytes) pairs that all have to match.
+More specific types are listed before the types they share bytes with.
+"""
+MAGIC_SIGNATURES: Dict[str, Tuple[Tuple[Tuple[int, bytes], ...], ...]] = {
+    "image/png": (((0, b"\x89PNG\r\n\x1a\n"),),),
+    "image/jpeg": (((0, b"\xff\xd8\xff"),),),
+    "image/gif": (((0, b"GIF87a"),), ((0, b"GIF89a"),)),
+    "image/webp": (((0, b"RIFF"), (8, b"WEBP")),),
+    "image/bmp": (((0, b"BM"), (6, b"\x00\x00\x00\x00")),),
+    "image/tiff": (((0, b"II*\x00"),), ((0, b"MM\x00*"),)),
+    "image/vnd.microsoft.icon": (((0, b"\x00\x00\x01\x00"),),),
+    "image/avif": (((4, b"ftypavif"),),),
+    "image/heic": (((4, b"ftypheic"),),),
+    "audio/wav": (((0, b"RIFF"), (8, b"WAVE")),),
+    "video/x-msvideo": (((0, b"RIFF"), (8, b"AVI ")),),
+    "audio/mpeg": (((0, b"ID3"),),),
+    "audio/ogg": (((0, b"OggS"),),),
+    "audio/flac": (((0, b"fLaC"),),),
+    "video/mp4": (((4, b"ftyp"),),),
+    "video/webm": (((0, b"\x1a\x45\xdf\xa3"),),),
+    "application/pdf": (((0, b"%PDF-"),),),
+    "application/postscript": (((0, b"%!PS"),),),
+    "application/rtf": (((0, b"{\\rtf"),),),
+    "application/zip": (((0, b"PK\x03\x04"),), ((0, b"PK\x05\x06"),), ((0, b"PK\x07\x08"),)),
+    "application/gzip": (((0, b"\x1f\x8b"),),),
+    "application/x-bzip2": (((0, b"BZh"),),),
+    "application/x-xz": (((0, b"\xfd7zXZ\x00"),),),
+    "application/zstd": (((0, b"\x28\xb5\x2f\xfd"),),),
+    "application/x-7z-compressed": (((0, b"7z\xbc\xaf\x27\x1c"),),),
+    "application/vnd.rar": (((0, b"Rar!\x1a\x07"),),),
+    "application/x-tar": (((257, b"ustar"),),),
+    "application/vnd.sqlite3": (((0, b"SQLite format 3\x00"),),),
+    "application/wasm": (((0, b"\x00asm"),),),
+    "application/x-elf": (((0, b"\x7fELF"),),),
+    "application/vnd.microsoft.portable-executable": (((0, b"MZ"),),),
+    "application/x-ole-storage": (((0, b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"),),),
+    "font/woff": (((0, b"wOFF"),),),
+    "font/woff2": (((0, b"wOF2"),),),
+    "font/otf": (((0, b"OTTO"),),),
+    "font/ttf": (((0, b"\x00\x01\x00\x00\x00"),),),
+    "application/xml": (((0, b"<?xml"),), ((0, b"\xef\xbb\xbf<?xml"),)),
+}
+
+"""
+The types whose signatures are checked on content that is text.
+Short signatures (such as 'BM' or 'MZ') also start plenty of ordinary text,
+so text is only matched against the signatures of formats that themselves start as text.
+"""
+TEXT_SIGNATURE_MIME_STRINGS: Tuple[str, ...] = (
+    "application/pdf", "application/postscript", "application/rtf", "application/xml"
+)
+
+"""
+Explicit parent types of mime types, for types whose hierarchy can not be derived
+from their structured syntax suffix or main type.
+"""
+SUBCLASS_OF: Dict[str, str] = {
+    "application/java-archive": "application/zip",
+    "application/vnd.android.package-archive": "application/java-archive",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": "application/zip",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet": "application/zip",
+    "application/vnd.openxmlformats-officedocument.presentationml.presentation": "application/zip",
+    "application/vnd.oasis.opendocument.text": "application/zip",
+    "application/vnd.oasis.opendocument.spreadsheet": "application/zip",
+    "application/vnd.oasis.opendocument.presentation": "application/zip",
+    "application/vnd.oasis.opendocument.graphics": "application/zip",
+    "application/msword": "application/x-ole-storage",
+    "application/vnd.ms-excel": "application/x-ole-storage",
+    "application/vnd.ms-powerpoint": "application/x-ole-storage",
+    "text/xml": "application/xml",
+    "application/xml": "text/plain",
+    "application/json": "text/plain",
+    "application/javascript": "text/plain",
+    "application/x-sh": "text/plain",
+}
+
+"""The parent types of mime types using a structured syntax suffix (the section after the '+')."""
+SUFFIX_PARENTS: Dict[str, str] = {
+    "xml": "application/xml",
+    "json": "application/json",
+    "zip": "application/zip",
+    "gzip": "application/gzip",
+}
+
+"""The root type every other (non empty) mime type is a subclass of."""
+ROOT_MIME_STRING:LiteralString = "application/octet-stream"
+
+def parent_mime_string(mime:str) -> Union[str, None]:
+    """
+    parent_mime_string
+    Gets the direct parent type of the given mime type.
+
+    Arguments:
+        mime - The mime type string, without any parameters.
+
+    Returns:
+        The parent mime type string, or None if the type is the root type (or empty).
+    """
+    if mime in ("", ROOT_MIME_STRING):
+        return None
+    if mime in SUBCLASS_OF:
+        return SUBCLASS_OF[mime]
+    index = mime.rfind("+")
+    if index >= 0 and mime[index+1:] in SUFFIX_PARENTS:
+        return SUFFIX_PARENTS[mime[index+1:]]
+    if mime.startswith("text/") and mime != "text/plain":
+        return "text/plain"
+    return ROOT_MIME_STRING
+
+def mime_string_lineage(mime:str) -> List[str]:
+    """
+    mime_string_lineage
+    Gets the given mime type followed by all of its parent types, most specific first.
+
+    Arguments:
+        mime - The mime type string. Any parameters are ignored.
+
+    Returns:
+        A list starting with the given type, and ending with the root type.
+    """
+    current:Union[str, None] = mime.split(";")[0].strip().lower()
+    lineage:List[str] = []
+    while current is not None and current not in lineage:
+        lineage.append(current)
+        current = parent_mime_string(current)
+    return lineage
+
+def mime_string_fits_text(mime:str) -> bool:
+    """
+    mime_string_fits_text
+    Checks if content that is text can be of the given mime type.
+
+    Arguments:
+        mime - The mime type string. Any parameters are ignored.
+
+    Returns:
+        True if the type is a kind of 'text/plain' or one of TEXT_SIGNATURE_MIME_STRINGS.
+    """
+    lineage = mime_string_lineage(mime)
+    return "text/plain" in lineage or lineage[0] in TEXT_SIGNATURE_MIME_STRINGS
+
+def signature_matches(buffer:bytes, signature:Tuple[Tuple[int, bytes], ...]) -> bool:
+    """
+    signature_matches
+    Checks the given buffer against a single signature.
+
+    Arguments:
+        buffer - The beginning of the content.
+        signature - A tuple of (offset, bytes) pairs that all have to match.
+
+    Returns:
+        True if all parts of the signature match.
+    """
+    for offset, magic in signature:
+        if buffer[offset:offset+len(magic)] != magic:
+            return False
+    return True
+
+def signature_read_size(mimes:Iterable[str]) -> int:
+    """
+    signature_read_size
+    Gets the amount of bytes needed to check all signatures of the given mime types.
+
+    Arguments:
+        mimes - The mime type strings.
+
+    Returns:
+        The number of bytes from the start of the content that the signatures cover.
+    """
+    size = 0
+    for mime in mimes:
+        for signature in MAGIC_SIGNATURES.get(mime, ()):
+            for offset, magic in signature:
+                size = max(size, offset + len(magic))
+    return size
+
+"""The amount of bytes needed to check every known signature."""
+SIGNATURE_READ_SIZE:int = signature_read_size(MAGIC_SIGNATURES)
+
+def mime_string_from_signature(buffer:bytes, text:bool = False) -> Union[str, None]:
+    """
+    mime_string_from_signature
+    Gets the mime type from the magic byte signature at the start of the given content.
+
+    Arguments:
+        buffer - The beginning of the content, at least SIGNATURE_READ_SIZE bytes if available.
+        text - True if the content is text, checking only TEXT_SIGNATURE_MIME_STRINGS.
+
+    Returns:
+        String with the matched mimetype if possible, otherwise None.
+    """
+    for mime, signatures in MAGIC_SIGNATURES.items():
+        if text and mime not in TEXT_SIGNATURE_MIME_STRINGS:
+            continue
+        for signature in signatures:
+            if signature_matches(buffer, signature):
+                return mime
+    return None
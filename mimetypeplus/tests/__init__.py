@@ -6,6 +6,19 @@ import unittest
 
 from .example_tests import *
 from .specific_tests import *
+from .bulk_tests import *
+from .verify_tests import *
+from .container_tests import *
+from .compression_tests import *
+from .charset_tests import *
+from .shmcache_tests import *
+from .index_tests import *
+from .uri_tests import *
+from .middleware_tests import *
+from .deadline_tests import *
+from .threading_tests import *
+from .consensus_tests import *
+from .tracing_tests import *
 
 if __name__ == "__main__":
     unittest.main()
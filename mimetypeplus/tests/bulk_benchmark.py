@@ -0,0 +1,77 @@
+"""
+Measures the throughput of the bulk module on a large column of 'Content-Type' values,
+against creating a MimeType object for every row.
+Not part of the test suite, run it using 'python -m mimetypeplus.tests.bulk_benchmark [rows]'.
+The rows default to 10 million; the per row baseline is only timed on a slice and extrapolated.
+"""
+
+import sys
+from random import Random
+from time import perf_counter
+
+from ..mimetypeplus import MimeType
+from .. import bulk
+
+DISTINCT_VALUES = ["text/html", "text/html; charset=utf-8", " Application/JSON ", "image/png",
+                   "IMAGE/JPEG", "application/octet-stream", "text/plain; charset=UTF-8",
+                   "video/mp4", "text", "application/javascript", "bad/too/many", ""]
+
+BASELINE_ROWS = 200000
+
+def make_column(rows:int, seed:int = 0):
+    """
+    Creates a column of the given amount of values picked from DISTINCT_VALUES.
+    """
+    random = Random(seed)
+    return random.choices(DISTINCT_VALUES, k=rows)
+
+def per_row(values) -> list:
+    """
+    Normalizes the values by creating a MimeType object for every row.
+    """
+    results = []
+    for value in values:
+        try:
+            results.append(str(MimeType(value)))
+        except AssertionError:
+            results.append(None)
+    return results
+
+def timed(name:str, rows:int, work, *args):
+    """
+    Runs the given work, printing its duration and throughput.
+
+    Returns:
+        The duration in seconds.
+    """
+    start = perf_counter()
+    work(*args)
+    duration = perf_counter() - start
+    print(f"{name:>28}: {duration:>8.3f}s  {rows / duration:>14.0f} rows/s")
+    return duration
+
+def main(rows:int = 10000000):
+    """
+    Prints the duration of normalizing, validating and factorizing the given amount of rows.
+    """
+    numpy_state = "available" if bulk.NUMPY_AVAILABLE else "not installed"
+    print(f"python {sys.version.split()[0]}, numpy {numpy_state}, {rows} rows")
+    column = make_column(rows)
+
+    sample = column[:min(rows, BASELINE_ROWS)]
+    baseline = timed("MimeType per row (slice)", len(sample), per_row, sample)
+    print(f"{'MimeType per row (estimate)':>28}: {baseline * rows / len(sample):>8.3f}s")
+
+    timed("bulk.normalize (list)", rows, bulk.normalize, column)
+    timed("bulk.validate (list)", rows, bulk.validate, column)
+    timed("bulk.factorize (list)", rows, bulk.factorize, column)
+
+    if bulk.NUMPY_AVAILABLE:
+        import numpy #pylint:disable=import-outside-toplevel
+        array = numpy.array(column, dtype=object)
+        timed("bulk.normalize (numpy)", rows, bulk.normalize, array)
+        timed("bulk.validate (numpy)", rows, bulk.validate, array)
+        timed("bulk.factorize (numpy)", rows, bulk.factorize, array)
+
+if __name__ == "__main__":
+    main(*(int(argument) for argument in sys.argv[1:2]))
@@ -0,0 +1,94 @@
+"""
+Tests the bulk module against the results of individual MimeType objects.
+"""
+
+import unittest
+
+from ..typings import Any, cast
+from ..mimetypeplus import MimeType
+from .. import bulk
+
+class BulkTests(unittest.TestCase):
+    """
+    Tests the bulk module against the results of individual MimeType objects.
+    """
+
+    EXAMPLE_VALUES = [
+        "text/html",
+        " Application/JSON ",
+        "image/svg+xml",
+        "text/html",
+        "text",
+        "text/html; charset=utf-8",
+        "bad/too/many",
+        None,
+    ]
+
+    def test_normalize(self):
+        """
+        Tests that normalizing matches encoding MimeType objects.
+        """
+        normalized = bulk.normalize(BulkTests.EXAMPLE_VALUES)
+        self.assertEqual(len(normalized), len(BulkTests.EXAMPLE_VALUES))
+        for value, result in zip(BulkTests.EXAMPLE_VALUES[:-2], normalized):
+            self.assertEqual(result, str(MimeType(value)))
+        self.assertListEqual(normalized[-2:], [None, None])
+
+    def test_validate(self):
+        """
+        Tests that validating matches MimeType.is_valid.
+        """
+        for strict in (True, False):
+            validated = bulk.validate(BulkTests.EXAMPLE_VALUES, strict=strict)
+            for value, result in zip(BulkTests.EXAMPLE_VALUES[:-2], validated):
+                self.assertEqual(result, MimeType(value).is_valid(strict))
+            self.assertListEqual(validated[-2:], [False, False])
+
+    def test_factorize(self):
+        """
+        Tests the categorical codes output.
+        """
+        codes, categories = bulk.factorize(BulkTests.EXAMPLE_VALUES)
+        self.assertEqual(codes[0], codes[3])
+        self.assertEqual(categories[codes[1]], "application/json")
+        self.assertEqual(codes[-1], -1)
+        self.assertEqual(len(categories), len(set(categories)))
+
+    @unittest.skipUnless(bulk.NUMPY_AVAILABLE, "the 'numpy' module is not installed")
+    def test_numpy(self):
+        """
+        Tests that NumPy arrays are returned as arrays of the same shape.
+        """
+        import numpy #pylint:disable=import-outside-toplevel
+        values = numpy.array(BulkTests.EXAMPLE_VALUES, dtype=object).reshape(2, 4)
+        #the results are NumPy arrays, which the list part of their return types does not cover
+        normalized = cast(Any, bulk.normalize(values))
+        self.assertIsInstance(normalized, numpy.ndarray)
+        self.assertEqual(normalized.shape, (2, 4))
+        self.assertListEqual(normalized.ravel().tolist(), bulk.normalize(BulkTests.EXAMPLE_VALUES))
+
+        validated = cast(Any, bulk.validate(values))
+        self.assertEqual(validated.dtype, numpy.bool_)
+        self.assertEqual(validated.shape, (2, 4))
+        self.assertListEqual(validated.ravel().tolist(), bulk.validate(BulkTests.EXAMPLE_VALUES))
+
+        codes, categories = cast(Any, bulk.factorize(values))
+        self.assertEqual(codes.dtype, numpy.intp)
+        self.assertEqual(codes.shape, (2, 4))
+        self.assertListEqual(categories, bulk.factorize(BulkTests.EXAMPLE_VALUES)[1])
+
+    @unittest.skipUnless(bulk.NUMPY_AVAILABLE, "the 'numpy' module is not installed")
+    def test_numpy_strings(self):
+        """
+        Tests NumPy fixed width string arrays.
+        """
+        import numpy #pylint:disable=import-outside-toplevel
+        values = numpy.array(["text/html", " Image/PNG ", "text/html"])
+        self.assertListEqual(cast(Any, bulk.normalize(values)).tolist(),
+                             ["text/html", "image/png", "text/html"])
+        codes, categories = cast(Any, bulk.factorize(values))
+        self.assertListEqual(codes.tolist(), [0, 1, 0])
+        self.assertListEqual(categories, ["text/html", "image/png"])
+
+if __name__ == "__main__":
+    unittest.main()
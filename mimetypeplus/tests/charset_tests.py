@@ -0,0 +1,66 @@
+"""
+Tests charset detection and mime type parameters.
+"""
+
+#pylint:disable=wildcard-import,unused-wildcard-import
+
+import unittest
+import codecs
+
+from ..mimetypeplus import *
+
+__all__ = ["CharsetTests"]
+
+class CharsetTests(unittest.TestCase):
+    """
+    Tests charset detection and mime type parameters.
+    """
+
+    def test_detection(self):
+        """
+        Tests the detected charsets of various contents.
+        """
+        self.assertEqual(charset_from_data(b"plain text"), "us-ascii")
+        self.assertEqual(charset_from_data("café".encode("utf-8")), "utf-8")
+        self.assertEqual(charset_from_data("café".encode("latin-1")), "iso-8859-1")
+        self.assertEqual(charset_from_data(codecs.BOM_UTF16_LE + "hi".encode("utf-16-le")),
+                         "utf-16")
+        self.assertEqual(charset_from_data(b"<?xml version=\"1.0\" encoding=\"Shift_JIS\"?>"),
+                         "shift_jis")
+        self.assertEqual(charset_from_data(b"<html><head><meta charset=\"windows-1252\">"),
+                         "windows-1252")
+        self.assertIsNone(charset_from_data(b"\x00\x01\x02binary"))
+
+    def test_bounded(self):
+        """
+        Tests that only the start (and optionally the end) of the content is scanned,
+        and that characters cut off at the end of partial content are allowed.
+        """
+        content = b"a" * CHARSET_READ_SIZE * 4 + "é".encode("latin-1")
+        self.assertEqual(charset_from_data(content), "us-ascii")
+        self.assertEqual(charset_from_data(content, sample_suffix=True), "iso-8859-1")
+        partial = ("é" * 10).encode("utf-8")[:-1]
+        self.assertEqual(charset_from_data(partial, partial=True), "utf-8")
+
+    def test_from_data(self):
+        """
+        Tests that text results carry a charset parameter.
+        """
+        mime = cast(MimeType, MimeType.from_data("café au lait".encode("utf-8")))
+        self.assertEqual(mime.maintype, "text")
+        self.assertEqual(mime.charset, "utf-8")
+
+    def test_parameters(self):
+        """
+        Tests parsing and encoding mime type parameters.
+        """
+        mime = MimeType("Text/HTML; Charset=UTF-8; title=\"a; b\"")
+        self.assertEqual(mime, "text/html")
+        self.assertEqual(mime.charset, "utf-8")
+        self.assertDictEqual(mime.parameters, {"charset": "utf-8", "title": "a; b"})
+        self.assertEqual(str(mime), "text/html; charset=utf-8; title=\"a; b\"")
+        mime.charset = ""
+        self.assertEqual(str(MimeType(mime)), "text/html; title=\"a; b\"")
+
+if __name__ == "__main__":
+    unittest.main()
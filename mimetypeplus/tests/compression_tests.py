@@ -0,0 +1,59 @@
+"""
+Tests detecting the type of compressed content.
+"""
+
+#pylint:disable=wildcard-import,unused-wildcard-import
+
+import unittest
+import gzip
+import bz2
+import lzma
+from io import BytesIO
+
+from ..mimetypeplus import *
+
+__all__ = ["CompressionTests"]
+
+class CompressionTests(unittest.TestCase):
+    """
+    Tests detecting the type of compressed content.
+    """
+
+    PNG_CONTENT = b"\x89PNG\r\n\x1a\n" + bytes(64)
+
+    def test_encodings(self):
+        """
+        Tests every supported compression encoding.
+        """
+        for compress, name in ((gzip.compress, "gzip"), (bz2.compress, "bzip2"),
+                               (lzma.compress, "xz")):
+            mime, encoding = MimeType.from_compressed_data(compress(CompressionTests.PNG_CONTENT))
+            self.assertEqual(encoding, name)
+            self.assertEqual(mime, "image/png")
+
+    def test_bounded(self):
+        """
+        Tests that only a bounded amount of content is decompressed,
+        and that unseekable streams are supported.
+        """
+        content = gzip.compress(b"a,b,c\n" * 1_000_000)
+        inner = decompress_head(BytesIO(content).read, "application/gzip")
+        self.assertEqual(len(inner), MAX_DECOMPRESSED_SIZE)
+
+        stream = BytesIO(content)
+        stream.seekable = lambda: False
+        mime, encoding = MimeType.from_compressed_stream(stream, hint_path="data.csv.gz")
+        self.assertEqual(encoding, "gzip")
+        self.assertEqual(mime, "text/csv")
+
+    def test_uncompressed(self):
+        """
+        Tests that uncompressed content is detected as usual.
+        """
+        mime, encoding = MimeType.from_compressed_data(CompressionTests.PNG_CONTENT)
+        self.assertIsNone(encoding)
+        self.assertEqual(mime, "image/png")
+        self.assertEqual(MimeType.from_stream(BytesIO(CompressionTests.PNG_CONTENT)), "image/png")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+"""
+Tests combining the answers of several detection backends into ranked candidates.
+"""
+
+import unittest
+from io import BytesIO
+from unittest.mock import patch
+from zipfile import ZipFile
+
+from .. import consensus
+from ..consensus import DetectionResult, Candidate
+
+PNG = b"\x89PNG\r\n\x1a\n" + bytes(64)
+
+class ConsensusTests(unittest.TestCase):
+    """
+    Tests combining the answers of several detection backends into ranked candidates.
+    """
+
+    def test_specific_wins(self):
+        """
+        Tests that a more specific answer wins over the generic answer it agrees with.
+        """
+        result = DetectionResult.from_data(b'{"a": 1}', hint_path="data.json",
+                                           backends=["signature", "text", "extension"])
+        self.assertEqual(result.mime, "application/json")
+        self.assertEqual(result.score, 1.0)
+        self.assertEqual(result.candidates[1].mime, "text/plain")
+        self.assertEqual(result.candidates[1].support, ("text",))
+
+    def test_disagreement(self):
+        """
+        Tests that a strong content match outranks a conflicting extension.
+        """
+        result = DetectionResult.from_data(PNG, hint_path="photo.jpg",
+                                           backends=["signature", "text", "extension"])
+        self.assertEqual([candidate.mime for candidate in result.candidates],
+                         ["image/png", "image/jpeg"])
+        self.assertAlmostEqual(result.score, 0.8 / 1.3)
+        self.assertFalse(result.exited_early)
+
+    def test_early_exit(self):
+        """
+        Tests exiting early once the first high confidence backend agrees with the extension.
+        """
+        result = DetectionResult.from_data(PNG, hint_path="photo.png",
+                                           backends=["signature", "text", "extension"])
+        self.assertTrue(result.exited_early)
+        self.assertEqual(result.candidates,
+                         [Candidate("image/png", 1.0, ("signature", "extension"))])
+        result = DetectionResult.from_data(PNG, hint_path="photo.png", early_exit=False,
+                                           backends=["signature", "text", "extension"])
+        self.assertFalse(result.exited_early)
+
+    def test_root_type(self):
+        """
+        Tests that answering only the root type never agrees with (or supports) other types.
+        """
+        def root_backend(sample, strict): #pylint:disable=unused-argument
+            return "application/octet-stream"
+        with patch.dict(consensus.CONSENSUS_BACKENDS, {"magic": root_backend}):
+            result = DetectionResult.from_data(bytes(64), hint_path="evil.png",
+                                               backends=["magic", "text", "extension"])
+        self.assertFalse(result.exited_early)
+        self.assertEqual(result.mime, "application/octet-stream")
+        self.assertEqual(result.candidates[1], Candidate("image/png", 0.5 / 1.4, ("extension",)))
+
+    def test_renamed_zip(self):
+        """
+        Tests that a plain zip renamed to a more specific kind of zip is not taken for that kind.
+        """
+        buffer = BytesIO()
+        with ZipFile(buffer, "w") as archive:
+            archive.writestr("notes.txt", "not a document")
+        result = DetectionResult.from_data(buffer.getvalue(), hint_path="fake.docx",
+                                           backends=["container", "signature", "extension"])
+        self.assertFalse(result.exited_early)
+        self.assertEqual(result.candidates,
+                         [Candidate("application/zip", 1.8 / 2.3, ("container", "signature"))])
+        result = DetectionResult.from_data(buffer.getvalue(), hint_path="fake.docx")
+        self.assertEqual(result.mime, "application/zip")
+
+    def test_path(self):
+        """
+        Tests detecting from a local path and rejecting unknown backends.
+        """
+        result = DetectionResult.from_path(__file__, backends=["text", "extension"])
+        self.assertEqual(result.mime, "text/x-python")
+        self.assertIsNone(DetectionResult.from_data(b"", backends=["signature"]).mime)
+        with self.assertRaises(ValueError):
+            DetectionResult.from_data(PNG, backends=["unknown"])
+
+if __name__ == "__main__":
+    unittest.main()
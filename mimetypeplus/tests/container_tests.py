@@ -0,0 +1,65 @@
+"""
+Tests detecting zip based container formats from their central directory.
+"""
+
+#pylint:disable=wildcard-import,unused-wildcard-import
+
+import unittest
+from io import BytesIO
+from zipfile import ZipFile, ZIP_DEFLATED
+
+from ..mimetypeplus import *
+
+__all__ = ["ContainerTests"]
+
+class ContainerTests(unittest.TestCase):
+    """
+    Tests detecting zip based container formats from their central directory.
+    """
+
+    @staticmethod
+    def make_zip(members:Dict[str, bytes]) -> bytes:
+        """
+        Creates a zip archive with the given members, storing a 'mimetype' member uncompressed.
+        """
+        buffer = BytesIO()
+        with ZipFile(buffer, "w") as archive:
+            for name, content in members.items():
+                compression = ZIP_STORED if name == "mimetype" else ZIP_DEFLATED
+                archive.writestr(name, content, compress_type=compression)
+        return buffer.getvalue()
+
+    def test_ooxml(self):
+        """
+        Tests OOXML documents.
+        """
+        content = ContainerTests.make_zip({
+            "[Content_Types].xml": b"<Types/>",
+            "word/document.xml": b"<document/>",
+        })
+        mime = cast(MimeType, MimeType.from_data(content))
+        self.assertEqual(mime.subtype,
+                         "vnd.openxmlformats-officedocument.wordprocessingml.document")
+
+    def test_mimetype_member(self):
+        """
+        Tests ODF documents and EPUB books, which declare their type in a 'mimetype' member.
+        """
+        content = ContainerTests.make_zip({
+            "mimetype": b"application/epub+zip",
+            "META-INF/container.xml": b"<container/>",
+        })
+        self.assertEqual(mime_string_from_container_data(content), "application/epub+zip")
+
+    def test_jar(self):
+        """
+        Tests JAR archives, and that plain archives are still reported as zip.
+        """
+        content = ContainerTests.make_zip({"META-INF/MANIFEST.MF": b"Manifest-Version: 1.0\n"})
+        self.assertEqual(mime_string_from_container_data(content), "application/java-archive")
+        content = ContainerTests.make_zip({"readme.txt": b"hello"})
+        self.assertEqual(mime_string_from_container_data(content), "application/zip")
+        self.assertIsNone(mime_string_from_container_data(b"PK\x03\x04 broken"))
+
+if __name__ == "__main__":
+    unittest.main()
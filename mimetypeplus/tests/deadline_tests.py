@@ -0,0 +1,118 @@
+"""
+Tests deadline bounded detection, racing the path detectors concurrently.
+"""
+
+#pylint:disable=wildcard-import,unused-wildcard-import
+
+import unittest
+import sys
+from threading import enumerate as enumerate_threads
+from subprocess import check_output
+from time import monotonic, sleep
+from unittest.mock import patch
+
+from .. import mimetypecheckers
+from ..mimetypeplus import *
+
+__all__ = ["DeadlineTests"]
+
+def slow_detector(path, strict): #pylint:disable=unused-argument
+    """
+    A detector stalling like a read from a stalled network filesystem.
+    """
+    sleep(1)
+    return "application/x-slow"
+
+def subprocess_detector(path, strict, timeout=None): #pylint:disable=unused-argument
+    """
+    A detector running a subprocess that never finishes in time.
+    """
+    check_output([sys.executable, "-c", "import time; time.sleep(5)"], timeout=timeout)
+    return "application/x-subprocess"
+
+def fast_detector(path, strict): #pylint:disable=unused-argument
+    """
+    A detector answering right away.
+    """
+    return "application/x-fast"
+
+class DeadlineTests(unittest.TestCase):
+    """
+    Tests deadline bounded detection, racing the path detectors concurrently.
+    """
+
+    def test_matches_sequential(self):
+        """
+        Tests that a generous deadline gives the same answer as running the detectors in order.
+        """
+        self.assertEqual(mime_string_from_path(__file__, deadline=10),
+                         mime_string_from_path(__file__))
+        self.assertEqual(MimeType.from_path(__file__, deadline=10), MimeType.from_path(__file__))
+
+    def test_stalled_detector(self):
+        """
+        Tests that a stalled high priority detector is reported, using a lower priority answer.
+        """
+        detectors = (Detector("slow", slow_detector, True),) + PATH_DETECTORS[-1:]
+        with patch.object(mimetypecheckers, "PATH_DETECTORS", detectors):
+            started = monotonic()
+            result = race_mime_string_from_path("page.html", deadline=0.05)
+            elapsed = monotonic() - started
+        self.assertEqual(result, RaceResult("text/html", "extension", ("slow",)))
+        self.assertLess(elapsed, 0.5)
+
+    def test_overdue_subprocess(self):
+        """
+        Tests that overdue subprocesses are killed at the deadline.
+        """
+        detectors = (Detector("subprocess", subprocess_detector, True, True),)
+        with patch.object(mimetypecheckers, "PATH_DETECTORS", detectors):
+            started = monotonic()
+            result = race_mime_string_from_path(__file__, deadline=0.2)
+            elapsed = monotonic() - started
+        self.assertEqual(result, RaceResult(None, None, ("subprocess",)))
+        self.assertLess(elapsed, 2)
+
+    def test_many_stalled_calls(self):
+        """
+        Tests that detectors stalled by earlier calls do not hold up later calls.
+        """
+        detectors = (Detector("slow", slow_detector, True), Detector("fast", fast_detector, True))
+        with patch.object(mimetypecheckers, "PATH_DETECTORS", detectors[:1]):
+            for _ in range(40):
+                race_mime_string_from_path(__file__, deadline=0.001)
+        with patch.object(mimetypecheckers, "PATH_DETECTORS", detectors):
+            result = race_mime_string_from_path(__file__, deadline=0.5)
+        self.assertEqual(result, RaceResult("application/x-fast", "fast", ("slow",)))
+
+    def test_stalled_threads_capped(self):
+        """
+        Tests that calls do not start more threads for a detector stalled by earlier calls.
+        """
+        def detector_threads():
+            return sum(thread.name == "mimetypeplus-detector" for thread in enumerate_threads())
+        before = detector_threads()
+        detectors = (Detector("slow", slow_detector, True),)
+        with patch.object(mimetypecheckers, "PATH_DETECTORS", detectors):
+            for _ in range(200):
+                result = race_mime_string_from_path(__file__, deadline=0.001)
+                self.assertEqual(result, RaceResult(None, None, ("slow",)))
+        self.assertLessEqual(detector_threads() - before, mimetypecheckers.MAX_STALLED_ATTEMPTS)
+
+    def test_subprocess_only_when_needed(self):
+        """
+        Tests that subprocess detectors are not started once a cheaper detector answered.
+        """
+        started = []
+        def counting_detector(path, strict, timeout=None): #pylint:disable=unused-argument
+            started.append(timeout)
+            return "application/x-subprocess"
+        detectors = (Detector("fast", fast_detector, True),
+                     Detector("subprocess", counting_detector, True, True))
+        with patch.object(mimetypecheckers, "PATH_DETECTORS", detectors):
+            result = race_mime_string_from_path(__file__, deadline=1)
+        self.assertEqual(result.detector, "fast")
+        self.assertListEqual(started, [])
+
+if __name__ == "__main__":
+    unittest.main()
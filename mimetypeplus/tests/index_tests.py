@@ -0,0 +1,93 @@
+"""
+Tests the persistent index of the mime types of directory trees.
+"""
+
+#pylint:disable=wildcard-import,unused-wildcard-import
+
+import unittest
+import os
+from tempfile import TemporaryDirectory
+
+from ..index import MimeIndex
+from ..mimetypecheckers import set_detection_cache, CACHE_DETECTOR
+
+class IndexTests(unittest.TestCase):
+    """
+    Tests the persistent index of the mime types of directory trees.
+    """
+
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.root = self.directory.name
+        os.mkdir(os.path.join(self.root, "sub"))
+        for name in ("a.txt", "b.html", os.path.join("sub", "c.TXT")):
+            with open(os.path.join(self.root, name), "w", encoding="utf8") as f:
+                f.write("some text\n")
+        self.database = TemporaryDirectory()
+        self.index = MimeIndex(os.path.join(self.database.name, "index.sqlite3"))
+
+    def tearDown(self):
+        self.index.close()
+        self.directory.cleanup()
+        self.database.cleanup()
+
+    def test_update(self):
+        """
+        Tests that only new, changed and removed files are processed again.
+        """
+        first = self.index.update(self.root)
+        self.assertEqual(first.detected, first.scanned)
+        self.assertEqual(first.removed, 0)
+        self.assertEqual(len(self.index), first.scanned)
+
+        second = self.index.update(self.root)
+        self.assertEqual(second.scanned, first.scanned)
+        self.assertEqual(second.detected, 0)
+        self.assertEqual(second.removed, 0)
+
+        os.remove(os.path.join(self.root, "a.txt"))
+        with open(os.path.join(self.root, "b.html"), "a", encoding="utf8") as f:
+            f.write("more text\n")
+        third = self.index.update(self.root)
+        self.assertEqual(third.removed, 1)
+        self.assertGreaterEqual(third.detected, 1)
+        self.assertIsNone(self.index.entry(os.path.join(self.root, "a.txt")))
+
+    def test_queries(self):
+        """
+        Tests querying the index by type and extension.
+        """
+        self.index.update(self.root)
+        c_path = os.path.join(self.root, "sub", "c.TXT")
+        self.assertListEqual(self.index.by_extension(".txt"),
+                             [os.path.join(self.root, "a.txt"), c_path])
+        self.assertIn(c_path, self.index.by_type("text/*"))
+        entry = self.index.entry(c_path)
+        self.assertIsNotNone(entry)
+        self.assertIn(c_path, self.index.by_type(str(self.index.get(c_path))))
+
+    def test_detection_cache(self):
+        """
+        Tests that the actual detector is recorded even with a detection cache installed.
+        """
+        class EverythingCached():
+            """
+            A detection cache that has every path cached.
+            """
+            def get(self, _key):
+                return "application/x-cached"
+            def put(self, key, mime):
+                pass
+        set_detection_cache(EverythingCached())
+        try:
+            self.index.update(self.root)
+        finally:
+            set_detection_cache(None)
+        entry = self.index.entry(os.path.join(self.root, "a.txt"))
+        if entry is None:
+            self.fail("the updated index has no entry for the file")
+        self.assertNotEqual(entry.detector, CACHE_DETECTOR)
+        self.assertNotEqual(entry.mime, "application/x-cached")
+
+if __name__ == "__main__":
+    unittest.main()
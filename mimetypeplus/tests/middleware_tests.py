@@ -0,0 +1,143 @@
+"""
+Tests the WSGI and ASGI middleware correcting response content types.
+"""
+
+#pylint:disable=wildcard-import,unused-wildcard-import
+
+import unittest
+import asyncio
+from unittest.mock import patch
+
+from ..typings import Union, List
+from ..middleware import WSGIContentTypeMiddleware, ASGIContentTypeMiddleware
+
+HTML_CHUNKS = [b"<!DOCTYPE html>", b"<html><body>", b"x" * 10000, b"</body></html>"]
+PNG_CHUNKS = [b"\x89PNG\r\n\x1a\n", bytes(10000), b"IEND"]
+
+def wsgi_app(content_type:str, etag:str = "", chunks:Union[List[bytes], None] = None):
+    """
+    Creates a WSGI application returning the chunks (HTML_CHUNKS by default)
+    with the given content type.
+    """
+    chunks = HTML_CHUNKS if chunks is None else chunks
+    calls = []
+    def app(environ, start_response): #pylint:disable=unused-argument
+        calls.append(1)
+        headers = [("Content-Type", content_type)]
+        if etag != "":
+            headers.append(("ETag", etag))
+        start_response("200 OK", headers)
+        return iter(chunks)
+    return app
+
+def run_wsgi(app, path:str = "/"):
+    """
+    Runs a WSGI application, returning the started headers and the body.
+    """
+    started = []
+    def start_response(status, headers, exc_info=None): #pylint:disable=unused-argument
+        started.append(dict(headers))
+        return lambda data: None
+    body = b"".join(app({"PATH_INFO": path}, start_response))
+    return started[-1], body
+
+class MiddlewareTests(unittest.TestCase):
+    """
+    Tests the WSGI and ASGI middleware correcting response content types.
+    """
+
+    def test_wsgi_corrects(self):
+        """
+        Tests correcting an untrusted type, streaming the body unchanged,
+        and that html is never served in place of a plain text or binary type.
+        """
+        app = wsgi_app("application/octet-stream", chunks=PNG_CHUNKS)
+        headers, body = run_wsgi(WSGIContentTypeMiddleware(app, sniff_size=64, nosniff=True))
+        self.assertEqual(headers["Content-Type"], "image/png")
+        self.assertEqual(headers["X-Content-Type-Options"], "nosniff")
+        self.assertEqual(body, b"".join(PNG_CHUNKS))
+
+        for content_type in ("text/plain", "application/octet-stream"):
+            middleware = WSGIContentTypeMiddleware(wsgi_app(content_type), sniff_size=64,
+                                                   nosniff=True)
+            headers, body = run_wsgi(middleware)
+            self.assertEqual(headers["Content-Type"], content_type)
+            self.assertEqual(headers["X-Content-Type-Options"], "nosniff")
+            self.assertEqual(body, b"".join(HTML_CHUNKS))
+
+    def test_wsgi_streams(self):
+        """
+        Tests that the sniffed chunks are sent before the application is resumed.
+        """
+        resumed = []
+        def app(environ, start_response): #pylint:disable=unused-argument
+            start_response("200 OK", [("Content-Type", "application/octet-stream")])
+            yield PNG_CHUNKS[0] + PNG_CHUNKS[1]
+            resumed.append(1)
+            yield PNG_CHUNKS[2]
+
+        started = []
+        def start_response(status, headers, exc_info=None): #pylint:disable=unused-argument
+            started.append(dict(headers))
+        body = iter(WSGIContentTypeMiddleware(app, sniff_size=64)({"PATH_INFO": "/"},
+                                                                  start_response))
+        self.assertEqual(next(body), PNG_CHUNKS[0] + PNG_CHUNKS[1])
+        self.assertEqual(started[0]["Content-Type"], "image/png")
+        self.assertEqual(resumed, [])
+        self.assertEqual(list(body), [PNG_CHUNKS[2]])
+
+    def test_wsgi_trusted(self):
+        """
+        Tests that trusted types are passed through untouched.
+        """
+        app = wsgi_app("application/json")
+        result = []
+        def start_response(status, headers, exc_info=None): #pylint:disable=unused-argument
+            result.append(dict(headers))
+        body = WSGIContentTypeMiddleware(app)({"PATH_INFO": "/"}, start_response)
+        self.assertEqual(result[0]["Content-Type"], "application/json")
+        self.assertNotIsInstance(body, type(x for x in ()))
+
+    def test_wsgi_cached(self):
+        """
+        Tests that sniffed types are cached per route and ETag.
+        """
+        middleware = WSGIContentTypeMiddleware(wsgi_app("", "\"v1\"", PNG_CHUNKS))
+        first, _ = run_wsgi(middleware, "/page")
+        with patch.object(middleware, "sniff", side_effect=AssertionError):
+            second, body = run_wsgi(middleware, "/page")
+        self.assertEqual(first["Content-Type"], "image/png")
+        self.assertEqual(second["Content-Type"], "image/png")
+        self.assertEqual(body, b"".join(PNG_CHUNKS))
+
+        #a trusted declared type is never replaced by a cached one
+        middleware.app = wsgi_app("application/json", "\"v1\"", PNG_CHUNKS)
+        third, _ = run_wsgi(middleware, "/page")
+        self.assertEqual(third["Content-Type"], "application/json")
+
+    def test_asgi(self):
+        """
+        Tests correcting an untrusted type in an ASGI application.
+        """
+        async def app(scope, receive, send): #pylint:disable=unused-argument
+            await send({"type": "http.response.start", "status": 200,
+                        "headers": [(b"content-type", b"application/octet-stream")]})
+            for index, chunk in enumerate(PNG_CHUNKS):
+                await send({"type": "http.response.body", "body": chunk,
+                            "more_body": index < len(PNG_CHUNKS) - 1})
+
+        sent = []
+        async def receive():
+            return {"type": "http.disconnect"}
+        async def send(message):
+            sent.append(message)
+        middleware = ASGIContentTypeMiddleware(app, sniff_size=64)
+        asyncio.run(middleware({"type": "http", "path": "/"}, receive, send))
+
+        self.assertEqual(sent[0]["type"], "http.response.start")
+        self.assertIn((b"content-type", b"image/png"), sent[0]["headers"])
+        self.assertEqual(b"".join(message["body"] for message in sent[1:]), b"".join(PNG_CHUNKS))
+        self.assertFalse(sent[-1]["more_body"])
+
+if __name__ == "__main__":
+    unittest.main()
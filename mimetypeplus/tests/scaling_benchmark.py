@@ -0,0 +1,62 @@
+"""
+Measures how the throughput of the thread safe read path scales with the amount of threads.
+Not part of the test suite, run it using 'python -m mimetypeplus.tests.scaling_benchmark'.
+Near linear scaling is only expected on free threaded builds of python (such as 3.13t),
+on other builds the GIL keeps the throughput about flat.
+"""
+
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+from ..mimetypeplus import MimeType
+
+HTML_SAMPLE = b"<!DOCTYPE html><html><head><title>x</title></head><body>" + b"hello " * 200
+STRINGS = ["text/html", " Image/PNG ", "application/json; charset=utf-8", "text", "video/mp4"]
+
+def from_data_work(iterations:int):
+    """
+    Detects the type of a HTML sample the given amount of times.
+    """
+    for _ in range(iterations):
+        MimeType.from_data(HTML_SAMPLE)
+
+def parsing_work(iterations:int):
+    """
+    Parses mime type strings the given amount of times.
+    """
+    for _ in range(iterations):
+        for string in STRINGS:
+            MimeType(string)
+
+def throughput(work, threads:int, iterations:int) -> float:
+    """
+    Measures the throughput of running the given work on the given amount of threads.
+
+    Returns:
+        The amount of iterations done per second, across all threads.
+    """
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        pool.submit(work, 1).result() #start the threads before timing
+        start = perf_counter()
+        for future in [pool.submit(work, iterations) for _ in range(threads)]:
+            future.result()
+        return threads * iterations / (perf_counter() - start)
+
+def main(max_threads:int = 8, iterations:int = 2000):
+    """
+    Prints the throughput and speedup of each kind of work for 1 up to max_threads threads.
+    """
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"python {sys.version.split()[0]}, GIL {'enabled' if gil else 'disabled'}")
+    for name, work in (("from_data", from_data_work), ("parsing", parsing_work)):
+        base = None
+        threads = 1
+        while threads <= max_threads:
+            rate = throughput(work, threads, iterations)
+            base = base if base is not None else rate
+            print(f"{name:>10} {threads:>3} threads: {rate:>12.0f}/s  x{rate / base:.2f}")
+            threads *= 2
+
+if __name__ == "__main__":
+    main()
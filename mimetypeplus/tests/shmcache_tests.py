@@ -0,0 +1,102 @@
+"""
+Tests the detection cache shared between processes.
+"""
+
+#pylint:disable=wildcard-import,unused-wildcard-import
+
+import unittest
+import json
+import os
+import sys
+from subprocess import run, Popen
+from tempfile import NamedTemporaryFile
+
+from ..mimetypeplus import *
+
+__all__ = ["SharedCacheTests"]
+
+@unittest.skipUnless(SHARED_MEMORY_AVAILABLE, "multiprocessing.shared_memory is not available")
+class SharedCacheTests(unittest.TestCase):
+    """
+    Tests the detection cache shared between processes.
+    """
+
+    def setUp(self):
+        self.cache = SharedDetectionCache(slots=64, type_slots=16)
+
+    def tearDown(self):
+        set_detection_cache(None)
+        self.cache.close()
+        self.cache.unlink()
+
+    def test_shared(self):
+        """
+        Tests that entries are visible to other attached caches.
+        """
+        self.cache.put(1234, "image/png")
+        other = SharedDetectionCache(self.cache.name, create=False)
+        try:
+            self.assertEqual(other.get(1234), "image/png")
+            self.assertIsNone(other.get(4321))
+            other.put(4321, "text/plain")
+            self.assertEqual(self.cache.get(4321), "text/plain")
+        finally:
+            other.close()
+
+    def test_eviction(self):
+        """
+        Tests that a full table keeps accepting (and evicting) entries.
+        """
+        for key in range(1, 1000):
+            self.cache.put(key, f"application/x-type{key % 8}")
+        self.assertEqual(self.cache.get(999), "application/x-type7")
+
+    def test_from_path(self):
+        """
+        Tests that detection from paths consults the installed cache.
+        """
+        with NamedTemporaryFile(suffix=".txt", delete=False) as f:
+            f.write(b"cached")
+        try:
+            self.cache.put(path_cache_key(f.name, os.stat(f.name)), "text/x-cached")
+            set_detection_cache(self.cache)
+            self.assertEqual(MimeType.from_path(f.name), "text/x-cached")
+        finally:
+            os.remove(f.name)
+
+    def test_outlives_creator(self):
+        """
+        Tests that the block remains once the process that created it exits.
+        """
+        name = f"mimetypeplus-test-{os.getpid()}"
+        script = ("from mimetypeplus.shmcache import SharedDetectionCache;"
+                  f"SharedDetectionCache({name!r}).put(1, 'image/png')")
+        run([sys.executable, "-c", script], check=True)
+        other = SharedDetectionCache(name, create=False)
+        try:
+            self.assertEqual(other.get(1), "image/png")
+        finally:
+            other.close()
+            other.unlink()
+
+    def test_concurrent_interning(self):
+        """
+        Tests that processes interning types at the same time all agree on their ids.
+        """
+        types = [f"application/x-type{index}" for index in range(12)]
+        script = ("import json, sys;"
+                  "from mimetypeplus.shmcache import SharedDetectionCache;"
+                  f"cache = SharedDetectionCache({self.cache.name!r}, create=False);"
+                  "types = json.loads(sys.argv[1]);"
+                  "print(json.dumps({mime: cache.type_id(mime) for mime in types}))")
+        orders = [types[offset:] + types[:offset] for offset in range(0, len(types), 3)]
+        processes = [Popen([sys.executable, "-c", script, json.dumps(order)], stdout=PIPE)
+                     for order in orders]
+        results = [json.loads(process.communicate()[0]) for process in processes]
+        ids = {mime: self.cache.type_id(mime) for mime in types}
+        self.assertEqual(len(set(ids.values())), len(types))
+        for result in results:
+            self.assertDictEqual(result, ids)
+
+if __name__ == "__main__":
+    unittest.main()
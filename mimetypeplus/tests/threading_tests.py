@@ -0,0 +1,90 @@
+"""
+Stress tests the thread safe read path, comparing results from many threads
+against the results of a single thread.
+"""
+
+#pylint:disable=wildcard-import,unused-wildcard-import
+
+import unittest
+import mimetypes
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event, Thread
+
+from .. import mimetypecheckers
+from ..mimetypeplus import *
+
+__all__ = ["ThreadingTests"]
+
+SAMPLES = [
+    b"<!DOCTYPE html><html><body>hello</body></html>",
+    b"\x89PNG\r\n\x1a\n" + bytes(64),
+    b"%PDF-1.7\n" + bytes(64),
+    "café au lait".encode("utf8"),
+    b"plain ascii text",
+]
+
+STRINGS = ["text/html", " Image/PNG ", "application/json; charset=utf-8", "text", "video/mp4"]
+
+URIS = ["https://example.com/a/page.html?x=1", "photo.JPG", "archive.tar.gz", "data:image/png,x"]
+
+def read_path() -> list:
+    """
+    Runs every kind of detection on the read path once.
+    """
+    results = []
+    for sample in SAMPLES:
+        results.append(str(MimeType.from_data(sample)))
+    for string in STRINGS:
+        mime = MimeType(string)
+        results.append((str(mime), mime.to_extention(), mime.to_extention(strict=True)))
+    for uri in URIS:
+        results.append(mime_string_from_uri(uri))
+        results.append(extension_mime_string_from_path(uri))
+    return results
+
+class ThreadingTests(unittest.TestCase):
+    """
+    Stress tests the thread safe read path, comparing results from many threads
+    against the results of a single thread.
+    """
+
+    def test_stress(self):
+        """
+        Tests detecting from many threads while the extension tables are refreshed.
+        """
+        expected = read_path()
+        stop = Event()
+        def refresh():
+            while not stop.is_set():
+                refresh_extension_tables()
+        refresher = Thread(target=refresh)
+        refresher.start()
+        try:
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                results = list(pool.map(lambda _: read_path(), range(400)))
+        finally:
+            stop.set()
+            refresher.join()
+        for result in results:
+            self.assertListEqual(result, expected)
+
+    def test_refresh(self):
+        """
+        Tests that a lookup that started on an older snapshot never answers for a newer one.
+        """
+        uri = "file.refreshtest"
+        self.assertIsNone(mime_string_from_uri(uri))
+        old = mimetypecheckers.EXTENSION_TABLES
+        mimetypes.add_type("application/x-refresh-test", ".refreshtest")
+        try:
+            refresh_extension_tables()
+            #the lookup on the old snapshot finishes (and is cached) only after the refresh
+            self.assertIsNone(cached_mime_string_from_uri_path(uri, False, old))
+            self.assertEqual(mime_string_from_uri(uri), "application/x-refresh-test")
+        finally:
+            del mimetypes.types_map[".refreshtest"]
+            refresh_extension_tables()
+        self.assertIsNone(mime_string_from_uri(uri))
+
+if __name__ == "__main__":
+    unittest.main()
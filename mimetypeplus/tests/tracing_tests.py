@@ -0,0 +1,110 @@
+"""
+Tests the sampling tracer of the detection hot path.
+"""
+
+#pylint:disable=wildcard-import,unused-wildcard-import
+
+import unittest
+import json
+from os import path as os_path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from .. import mimetypecheckers
+from ..mimetypeplus import *
+from ..cmds import FILE_CMD
+from ..tracing import Tracer, set_tracer
+
+__all__ = ["TracingTests"]
+
+class TracingTests(unittest.TestCase):
+    """
+    Tests the sampling tracer of the detection hot path.
+    """
+
+    def tearDown(self):
+        set_tracer(None)
+
+    def test_path_spans(self):
+        """
+        Tests the spans recorded for detecting a path, and exporting them.
+        """
+        traces = []
+        tracer = Tracer(1.0, traces.append)
+        set_tracer(tracer)
+        #the in process detectors would answer before the 'file' command is run
+        detectors = tuple(detector for detector in PATH_DETECTORS
+                          if detector.name in ("container", "file"))
+        with patch.object(mimetypecheckers, "PATH_DETECTORS", detectors):
+            mime_string_from_path(__file__)
+        self.assertEqual(len(traces), 1)
+        self.assertEqual(tracer.traces, traces)
+
+        trace = traces[0]
+        self.assertEqual(trace.root.name, "mime_string_and_detector_from_path")
+        self.assertEqual(trace.root.args["source"], __file__)
+        names = [span.name for span in trace.spans]
+        self.assertIn("container", names)
+        self.assertEqual(names[-1], "mime_string_and_detector_from_path")
+        if FILE_CMD is not None:
+            self.assertIn("stat", names)
+            self.assertIn("spawn", names)
+            self.assertIn("wait", names)
+
+        with TemporaryDirectory() as directory:
+            exported = os_path.join(directory, "trace.json")
+            tracer.export_chrome_trace(exported)
+            with open(exported, encoding="utf8") as f:
+                events = json.load(f)["traceEvents"]
+        self.assertEqual(len(events), len(trace.spans))
+        self.assertTrue(all(event["ph"] == "X" and event["dur"] >= 0 for event in events))
+
+    def test_data_spans(self):
+        """
+        Tests the spans recorded for detecting data, including nested calls.
+        """
+        tracer = Tracer()
+        set_tracer(tracer)
+        with TemporaryDirectory() as directory:
+            page = os_path.join(directory, "page")
+            with open(page, "wb") as f:
+                f.write(b"<!DOCTYPE html><html></html>")
+            with open(page, "rb") as f:
+                MimeType.from_stream(f)
+        self.assertEqual(len(tracer.traces), 1)
+        spans = tracer.traces[0].spans
+        reads = [span.args["bytes"] for span in spans if span.name == "read"]
+        self.assertIn(28, reads)
+        charsets = [span.args["charset"] for span in spans if span.name == "charset"]
+        self.assertListEqual(charsets, ["us-ascii"])
+        self.assertIn("mime_string_from_data", [span.name for span in spans])
+        #the recorded source is described, rather than keeping the buffer alive
+        sources = [span.args["source"] for span in spans if span.name == "mime_string_from_data"]
+        self.assertListEqual(sources, [28])
+
+    def test_sampling(self):
+        """
+        Tests that unsampled calls and calls faster than the threshold are not kept.
+        """
+        tracer = Tracer(0.0)
+        set_tracer(tracer)
+        mime_string_from_data(b"plain text")
+        self.assertListEqual(tracer.traces, [])
+        tracer = Tracer(1.0, threshold=60)
+        set_tracer(tracer)
+        mime_string_from_data(b"plain text")
+        self.assertListEqual(tracer.traces, [])
+
+    def test_race_threads(self):
+        """
+        Tests that detectors raced on other threads are recorded in the trace of the call.
+        """
+        tracer = Tracer()
+        set_tracer(tracer)
+        race_mime_string_from_path(__file__, deadline=10)
+        spans = tracer.traces[0].spans
+        self.assertIn("container", [span.name for span in spans])
+        self.assertGreater(len({span.thread for span in spans}), 1)
+
+if __name__ == "__main__":
+    unittest.main()
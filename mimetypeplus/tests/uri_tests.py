@@ -0,0 +1,57 @@
+"""
+Tests detecting the types of URIs without touching the local filesystem.
+"""
+
+#pylint:disable=wildcard-import,unused-wildcard-import
+
+import unittest
+from base64 import b64encode
+
+from ..mimetypeplus import *
+
+__all__ = ["URITests"]
+
+class URITests(unittest.TestCase):
+    """
+    Tests detecting the types of URIs without touching the local filesystem.
+    """
+
+    def test_extensions(self):
+        """
+        Tests URIs with extensions, queries and fragments.
+        """
+        self.assertEqual(mime_string_from_uri("https://example.com/a/page.HTML?x=1.png#top"),
+                         "text/html")
+        self.assertEqual(mime_string_from_uri("ftp://example.com/archive.tar.gz"),
+                         "application/x-tar")
+        self.assertEqual(mime_string_from_uri("C:\\files\\image.png"), "image/png")
+        self.assertIsNone(mime_string_from_uri("https://example.com/api/data"))
+        self.assertIsNone(MimeType.from_uri("/no/such/local/file"))
+
+    def test_matches_guess_type(self):
+        """
+        Tests that extension lookups match mimetypes.guess_type.
+        """
+        for path in ("a.json", "b.tgz", "c.JPG", "d.xul", "e.unknown"):
+            for strict in (True, False):
+                self.assertEqual(mime_string_from_uri(path, strict),
+                                 guess_type_path_URI(path, strict)[0])
+
+    def test_data(self):
+        """
+        Tests answering 'data:' URIs from their header, and sniffing their payload.
+        """
+        self.assertEqual(mime_string_from_uri("data:,hello"), "text/plain; charset=us-ascii")
+        self.assertEqual(mime_string_from_uri("data:Image/GIF;base64,R0lGODlh"), "image/gif")
+        png = "data:application/octet-stream;base64," + b64encode(
+            b"\x89PNG\r\n\x1a\n" + bytes(10000)
+        ).decode("ascii")
+        self.assertEqual(mime_string_from_uri(png), "application/octet-stream")
+        self.assertEqual(mime_string_from_uri(png, sniff_data=True), "image/png")
+        html = MimeType.from_uri("data:text/html;charset=UTF-8,%3Cp%3E")
+        if html is None:
+            self.fail("the 'data:' URI was not answered from its header")
+        self.assertEqual(html.charset, "utf-8")
+
+if __name__ == "__main__":
+    unittest.main()
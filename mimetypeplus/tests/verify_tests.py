@@ -0,0 +1,133 @@
+"""
+Tests verifying claimed mime types against content.
+"""
+
+#pylint:disable=wildcard-import,unused-wildcard-import
+
+import unittest
+from io import BytesIO, RawIOBase
+from os import path as os_path
+from tempfile import TemporaryDirectory
+from zipfile import ZipFile
+
+from ..mimetypeplus import *
+
+__all__ = ["VerifyTests"]
+
+class UnseekableStream(RawIOBase):
+    """
+    A binary stream that can not seek, such as a pipe or a socket.
+    """
+
+    def __init__(self, content:bytes):
+        super().__init__()
+        self.content = BytesIO(content)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        return self.content.readinto(buffer)
+
+class VerifyTests(unittest.TestCase):
+    """
+    Tests verifying claimed mime types against content.
+    """
+
+    PNG_CONTENT = b"\x89PNG\r\n\x1a\n" + bytes(64)
+    GIF_CONTENT = b"GIF89a" + bytes(64)
+
+    def test_accept(self):
+        """
+        Tests content that matches its claimed type.
+        """
+        result = MimeType.verify(VerifyTests.PNG_CONTENT, "image/png")
+        self.assertEqual(result.verdict, VERIFY_ACCEPT)
+        self.assertEqual(result.detected, "image/png")
+
+    def test_reject(self):
+        """
+        Tests content that does not match its claimed type.
+        """
+        result = MimeType.verify(VerifyTests.GIF_CONTENT, MimeType("image/png"))
+        self.assertEqual(result.verdict, VERIFY_REJECT)
+        self.assertEqual(result.detected, "image/gif")
+
+    def test_unknown(self):
+        """
+        Tests claimed types without any known signature.
+        """
+        result = MimeType.verify(VerifyTests.PNG_CONTENT, "application/x-something")
+        self.assertEqual(result.verdict, VERIFY_UNKNOWN)
+
+    def test_stream(self):
+        """
+        Tests that only the needed bytes are read from streams, and their position is kept.
+        """
+        stream = BytesIO(VerifyTests.PNG_CONTENT)
+        result = MimeType.verify(stream, "image/png")
+        self.assertEqual(result.verdict, VERIFY_ACCEPT)
+        self.assertEqual(stream.tell(), 0)
+
+    def test_unseekable_stream(self):
+        """
+        Tests that the head already read from unseekable streams is still detected.
+        """
+        result = MimeType.verify(UnseekableStream(VerifyTests.GIF_CONTENT), "image/png")
+        self.assertEqual(result.verdict, VERIFY_REJECT)
+        self.assertEqual(result.detected, "image/gif")
+
+    def test_parent_signature(self):
+        """
+        Tests that matching only the signature of a parent type is not enough.
+        """
+        buffer = BytesIO()
+        with ZipFile(buffer, "w") as archive:
+            archive.writestr("readme.txt", b"hello")
+        zip_content = buffer.getvalue()
+        self.assertEqual(MimeType.verify(zip_content, "application/zip").verdict, VERIFY_ACCEPT)
+        result = MimeType.verify(zip_content, "application/vnd.openxmlformats-officedocument"
+                                              ".wordprocessingml.document")
+        self.assertEqual(result.verdict, VERIFY_REJECT)
+        self.assertEqual(result.detected, "application/zip")
+
+        avif_content = (b"\x00\x00\x00\x20ftypavif\x00\x00\x00\x00avifmif1miafMA1B"
+                        b"\x00\x00\x00\x00meta" + bytes(200))
+        result = MimeType.verify(avif_content, "video/mp4")
+        self.assertEqual(result.verdict, VERIFY_REJECT)
+        self.assertEqual(result.detected, "image/avif")
+
+    def test_extension_ignored(self):
+        """
+        Tests that the extension of a path is never used as evidence.
+        """
+        with TemporaryDirectory() as directory:
+            path = os_path.join(directory, "fake.png")
+            with open(path, "wb") as f:
+                f.write(b"not an image at all")
+            result = MimeType.verify(path, "image/png")
+        self.assertEqual(result.verdict, VERIFY_REJECT)
+        self.assertIsNotNone(result.detected)
+        self.assertEqual(MimeType(cast(str, result.detected)), "text/plain")
+
+    def test_text(self):
+        """
+        Tests that text is not mistaken for formats with short signatures.
+        """
+        executable = "application/vnd.microsoft.portable-executable"
+        for content, claimed in ((b"BMW makes cars", "image/bmp"),
+                                 (b"MZ is a postcode", executable),
+                                 (b"ID3 tags are metadata", "audio/mpeg")):
+            self.assertEqual(MimeType.verify(content, claimed).verdict, VERIFY_REJECT)
+            self.assertEqual(MimeType.from_data(content), "text/plain")
+
+    def test_lineage(self):
+        """
+        Tests the mime type hierarchy used when verifying.
+        """
+        self.assertListEqual(mime_string_lineage("image/svg+xml; charset=utf-8"),
+                             ["image/svg+xml", "application/xml", "text/plain",
+                              "application/octet-stream"])
+
+if __name__ == "__main__":
+    unittest.main()
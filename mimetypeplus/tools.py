@@ -4,7 +4,7 @@ tools
 The tools used in the MimeType module
 """
 
-#pylint:disable=wildcard-import,unused-wildcard-import
+#pylint:disable=wildcard-import,unused-wildcard-import,pointless-string-statement
 
 from .typings import *
 
@@ -18,3 +18,54 @@ def singlify_str(*in_strs:LiteralString) -> LiteralString:
         in the given string (in no particular order).
     """
     return cast(LiteralString, "".join(set("".join(in_strs))))
+
+"""Characters that require a parameter value to be quoted (RFC 2045 'tspecials' and whitespace)."""
+PARAMETER_SPECIAL_CHARACTERS:LiteralString = "()<>@,;:\\\"/[]?= \t"
+
+def split_parameters(string:str) -> Tuple[str, Dict[str, str]]:
+    """
+    split_parameters
+    Splits the parameters (such as '; charset=utf-8') off of a mime type string.
+
+    Arguments:
+        string - The full mime type string.
+
+    Returns:
+        A tuple of the mime type string without any parameters,
+        and a dictionary of the parameters, with lowercase names and unquoted values.
+    """
+    mime, _, rest = string.partition(";")
+    parameters:Dict[str, str] = {}
+    while rest != "":
+        part, _, rest = rest.partition(";")
+        name, equals, value = part.partition("=")
+        name = name.strip().lower()
+        value = value.strip()
+        if value.startswith("\"") and equals != "":
+            #quoted values may themselves contain ';'
+            while not (len(value) > 1 and value.endswith("\"")) and rest != "":
+                extra, _, rest = rest.partition(";")
+                value += ";" + extra.rstrip()
+            value = value[1:-1].replace("\\\"", "\"").replace("\\\\", "\\")
+        if name != "" and equals != "":
+            parameters[name] = value
+    return mime, parameters
+
+def join_parameters(parameters:Dict[str, str]) -> str:
+    """
+    join_parameters
+    Encodes the given parameters to be appended to a mime type string.
+
+    Arguments:
+        parameters - A dictionary of parameter names and values.
+
+    Returns:
+        A string of all the parameters (such as '; charset=utf-8'),
+        quoting values where needed. A blank string if there are no parameters.
+    """
+    joined = ""
+    for name, value in parameters.items():
+        if value == "" or any(char in PARAMETER_SPECIAL_CHARACTERS for char in value):
+            value = "\"" + value.replace("\\", "\\\\").replace("\"", "\\\"") + "\""
+        joined += f"; {name}={value}"
+    return joined
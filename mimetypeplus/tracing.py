@@ -0,0 +1,389 @@
+"""
+tracing
+
+An opt in sampling tracer for the detection hot path.
+Sampled calls record spans of every stat, read, detector attempt, subprocess and cache lookup,
+which can be passed to a callback or exported as Chrome trace event JSON
+(loadable in chrome://tracing or Perfetto).
+Without a tracer set, or for calls that are not sampled, every span is a shared no-op object.
+"""
+
+#pylint:disable=wildcard-import,unused-wildcard-import,pointless-string-statement
+
+import json
+from collections import deque
+from contextvars import ContextVar
+from functools import wraps
+from os import getpid, fspath
+from random import random
+from threading import get_ident
+from time import perf_counter_ns
+
+from .typings import *
+
+"""The tracer of the detection hot path, or None if not tracing. Set using set_tracer."""
+TRACER: Any = None
+
+"""The trace of the sampled call running in the current context, if any."""
+ACTIVE_TRACE: Any = ContextVar("mimetypeplus_active_trace", default=None)
+
+class NullSpan():
+    """
+    NullSpan
+
+    A span that records nothing, used whenever a call is not sampled.
+    """
+
+    def __enter__(self) -> 'NullSpan':
+        return self
+
+    def __exit__(self, *exc_info:Any) -> bool:
+        return False
+
+    def set(self, **args:Any):
+        """
+        set
+        Ignores the given arguments.
+        """
+
+"""The shared span used whenever a call is not sampled."""
+NULL_SPAN = NullSpan()
+
+class Span():
+    """
+    Span
+
+    A single timed operation within a sampled call.
+    """
+
+    __slots__ = ("trace", "name", "category", "args", "start_ns", "end_ns", "thread")
+
+    def __init__(self, trace:'Trace', name:str, category:str, args:Dict[str, Any]):
+        """
+        __init__ Creates a span, timed once entered.
+
+        Keyword Arguments:
+            trace -- The trace the span belongs to.
+            name -- The name of the operation (such as the name of a detector).
+            category -- The kind of operation, such as 'io', 'detector', 'subprocess' or 'cache'.
+            args -- Details of the operation.
+        """
+        self.trace = trace
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start_ns = 0
+        self.end_ns = 0
+        self.thread = 0
+
+    def __enter__(self) -> 'Span':
+        self.thread = get_ident()
+        self.start_ns = perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type:Any, exc:Any, traceback:Any) -> bool:
+        self.end_ns = perf_counter_ns()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        #recorded spans keep only JSON compatible details, never the buffers or streams themselves
+        self.args = {key: describe(value) for key, value in self.args.items()}
+        self.trace.spans.append(self)
+        return False
+
+    def set(self, **args:Any):
+        """
+        set
+        Adds details to the span.
+
+        Arguments:
+            args - The details, as keyword arguments.
+        """
+        self.args.update(args)
+
+    @property
+    def duration(self) -> float:
+        """
+        duration
+        The duration of the span in seconds.
+        """
+        return (self.end_ns - self.start_ns) / 1e9
+
+class RootSpan(Span):
+    """
+    RootSpan
+
+    The span of a whole sampled call, making its trace active while it runs.
+    """
+
+    __slots__ = ("token",)
+
+    def __init__(self, trace:'Trace', name:str, category:str, args:Dict[str, Any]):
+        super().__init__(trace, name, category, args)
+        self.token:Any = None
+
+    def __enter__(self) -> 'RootSpan':
+        self.token = ACTIVE_TRACE.set(self.trace)
+        super().__enter__()
+        return self
+
+    def __exit__(self, exc_type:Any, exc:Any, traceback:Any) -> bool:
+        super().__exit__(exc_type, exc, traceback)
+        ACTIVE_TRACE.reset(self.token)
+        self.trace.root = self
+        self.trace.tracer.record(self.trace)
+        return False
+
+class Trace():
+    """
+    Trace
+
+    The spans of a single sampled call.
+    """
+
+    def __init__(self, tracer:'Tracer'):
+        """
+        __init__ Creates an empty trace.
+
+        Keyword Arguments:
+            tracer -- The tracer that sampled the call.
+        """
+        self.tracer = tracer
+        self.spans:List[Span] = []
+        self.root:Union[RootSpan, None] = None
+
+    @property
+    def duration(self) -> float:
+        """
+        duration
+        The duration of the whole call in seconds, 0 while it is still running.
+        """
+        return self.root.duration if self.root is not None else 0.0
+
+    def chrome_events(self) -> List[Dict[str, Any]]:
+        """
+        chrome_events
+        Converts the spans of the trace into Chrome trace events.
+
+        Returns:
+            A list of complete ('X') events, timestamps in microseconds.
+        """
+        pid = getpid()
+        return [{"name": span.name,
+                 "cat": span.category,
+                 "ph": "X",
+                 "ts": span.start_ns / 1000,
+                 "dur": (span.end_ns - span.start_ns) / 1000,
+                 "pid": pid,
+                 "tid": span.thread,
+                 "args": span.args
+                } for span in list(self.spans)]
+
+class Tracer():
+    """
+    Tracer
+
+    Samples calls on the detection hot path, keeping the traces of those slower than a threshold.
+    Install it using set_tracer.
+    """
+
+    def __init__(self,
+                 sample_rate:float = 1.0,
+                 callback:Union[Callable[[Trace], Any], None] = None,
+                 *,
+                 threshold:float = 0.0,
+                 max_traces:int = 1024
+                ):
+        """
+        __init__ Creates a tracer.
+
+        Keyword Arguments:
+            sample_rate -- The share of calls that are traced, from 0 to 1.
+            callback -- Called with every kept Trace once its call finished,
+                from the thread that made the call.
+            threshold -- The minimum duration (in seconds) of the calls whose traces are kept.
+            max_traces -- The amount of the latest kept traces held for exporting.
+        """
+        self.sample_rate = sample_rate
+        self.callback = callback
+        self.threshold = threshold
+        self.__traces:'deque[Trace]' = deque(maxlen=max_traces)
+
+    def sampled(self) -> bool:
+        """
+        sampled
+        Decides if a call is traced.
+
+        Returns:
+            True for a share of calls matching the sample rate.
+        """
+        return self.sample_rate >= 1.0 or random() < self.sample_rate
+
+    def record(self, trace:Trace):
+        """
+        record
+        Keeps the trace of a finished call if it is slow enough, and passes it to the callback.
+
+        Arguments:
+            trace - The finished trace.
+        """
+        if trace.duration < self.threshold:
+            return
+        self.__traces.append(trace)
+        if self.callback is not None:
+            self.callback(trace)
+
+    @property
+    def traces(self) -> List[Trace]:
+        """
+        traces
+        The latest kept traces, oldest first.
+        """
+        return list(self.__traces)
+
+    def clear(self):
+        """
+        clear
+        Drops all kept traces.
+        """
+        self.__traces.clear()
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """
+        chrome_trace
+        Converts all kept traces into a Chrome trace event document.
+
+        Returns:
+            A dictionary in the JSON object format of Chrome trace events.
+        """
+        events:List[Dict[str, Any]] = []
+        for trace in self.traces:
+            events.extend(trace.chrome_events())
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path:Union[str, PathLike]):
+        """
+        export_chrome_trace
+        Writes all kept traces to a Chrome trace event JSON file.
+
+        Arguments:
+            path - The path of the JSON file.
+        """
+        with open(fspath(path), "w", encoding="utf8") as f:
+            json.dump(self.chrome_trace(), f)
+
+def set_tracer(tracer:Union[Tracer, None]):
+    """
+    set_tracer
+    Sets the tracer of the detection hot path.
+
+    Arguments:
+        tracer - A Tracer, or None to stop tracing.
+    """
+    global TRACER #pylint:disable=global-statement
+    TRACER = tracer
+
+def describe(value:Any) -> Any:
+    """
+    describe
+    Converts a span detail into a JSON compatible value.
+
+    Arguments:
+        value - The detail.
+
+    Returns:
+        The value if it is a JSON scalar, the length of byte content,
+        or otherwise its string form.
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    if isinstance(value, PathLike):
+        return fspath(value)
+    return str(value)
+
+def span(name:str, category:str, **args:Any) -> Union[Span, NullSpan]:
+    """
+    span
+    Creates a span within the sampled call running in the current context.
+
+    Arguments:
+        name - The name of the operation.
+        category - The kind of operation.
+        args - Details of the operation.
+
+    Returns:
+        A span to use as a context manager, NULL_SPAN if the current call is not sampled.
+    """
+    if TRACER is None:
+        return NULL_SPAN
+    trace = ACTIVE_TRACE.get()
+    if trace is None:
+        return NULL_SPAN
+    return Span(trace, name, category, args)
+
+def trace_call(name:str, **args:Any) -> Union[Span, NullSpan]:
+    """
+    trace_call
+    Creates the span of a call, sampling it if no sampled call is already running.
+
+    Arguments:
+        name - The name of the call.
+        args - Details of the call.
+
+    Returns:
+        A span to use as a context manager, NULL_SPAN if the call is not sampled.
+    """
+    tracer = TRACER
+    if tracer is None:
+        return NULL_SPAN
+    trace = ACTIVE_TRACE.get()
+    if trace is not None:
+        return Span(trace, name, "call", args)
+    if not tracer.sampled():
+        return NULL_SPAN
+    return RootSpan(Trace(tracer), name, "call", args)
+
+def traced(function:Callable[..., Any]) -> Callable[..., Any]:
+    """
+    traced
+    Decorates a function so that its calls are sampled, see trace_call.
+    The first argument is recorded as the source of the call, see describe.
+
+    Arguments:
+        function - The function.
+
+    Returns:
+        The decorated function.
+    """
+    @wraps(function)
+    def wrapper(*args:Any, **kwargs:Any) -> Any:
+        if TRACER is None:
+            return function(*args, **kwargs)
+        with trace_call(function.__name__, source=args[0] if len(args) > 0 else None):
+            return function(*args, **kwargs)
+    return wrapper
+
+def bind(function:Callable[..., Any]) -> Callable[..., Any]:
+    """
+    bind
+    Binds a function to the sampled call running in the current context,
+    so that its spans are recorded when it runs on another thread.
+
+    Arguments:
+        function - The function.
+
+    Returns:
+        The function itself if the current call is not sampled, otherwise the bound function.
+    """
+    trace = ACTIVE_TRACE.get() if TRACER is not None else None
+    if trace is None:
+        return function
+    @wraps(function)
+    def bound(*args:Any, **kwargs:Any) -> Any:
+        token = ACTIVE_TRACE.set(trace)
+        try:
+            return function(*args, **kwargs)
+        finally:
+            ACTIVE_TRACE.reset(token)
+    return bound
@@ -25,6 +25,21 @@ try:
 except ImportError:
     from typing_extensions import Iterable #type:ignore
 
+try:
+    from typing import Dict #type:ignore
+except ImportError:
+    from typing_extensions import Dict #type:ignore
+
+try:
+    from typing import Any #type:ignore
+except ImportError:
+    from typing_extensions import Any #type:ignore
+
+try:
+    from typing import NamedTuple #type:ignore
+except ImportError:
+    from typing_extensions import NamedTuple #type:ignore
+
 try:
     from typing import Self #type:ignore
 except ImportError:
@@ -61,10 +76,6 @@ except ImportError:
 try:
     from types import NotImplementedType #type:ignore
 except ImportError:
-    try:
-        from typing import Any #type:ignore
-    except ImportError:
-        from typing_extensions import Any #type:ignore
     NotImplementedType:TypeAlias = Any
 
 try: